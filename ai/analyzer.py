@@ -1,10 +1,14 @@
 import concurrent.futures
+import functools
+import glob
+import hashlib
+import itertools
 import json
 import logging
 import os
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -12,10 +16,9 @@ from llama_index.core import Document
 from llama_index.core.node_parser import SimpleNodeParser
 from llama_index.core.vector_stores import SimpleVectorStore
 
-from db.operations import (
-    needs_reindex,
-    store_file,
-)
+from db.connection import close_thread_pooled_connections
+from db.operations import store_file
+from utils.admission import AdmissionController
 from utils.logger import get_logger
 
 from .llama_embeddings import OpenAICompatibleEmbedding
@@ -24,15 +27,41 @@ from .openai import call_coding_api
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
 
-def compute_file_hash(file_path: str) -> str:
-    """Compute MD5 hash of a file for change detection."""
-    import hashlib
+_BINARY_SNIFF_BYTES = 4096
 
-    try:
-        with open(file_path, "rb") as f:
-            return hashlib.md5(f.read()).hexdigest()
-    except Exception:
-        return ""
+
+def _read_file(file_path: str) -> tuple[str, str, float]:
+    """
+    Read a file once as bytes and derive its text, its change-detection hash and its mtime.
+    Decoding the whole buffer in one call is cheaper than a text-mode read, and the mtime
+    comes from fstat on the already open descriptor instead of a second path lookup.
+    Files with a NUL byte in their first _BINARY_SNIFF_BYTES are treated as binary and
+    returned with empty content without reading (or decoding) the rest.
+
+    Returns:
+        Tuple of (content, md5 hex digest, mtime); content and hash are "" for binary files
+    """
+    with open(file_path, "rb") as f:
+        mtime = os.fstat(f.fileno()).st_mtime
+        head = f.read(_BINARY_SNIFF_BYTES)
+        if b"\x00" in head:
+            return "", "", mtime
+        data = head + f.read()
+    return data.decode("utf-8", errors="ignore"), hashlib.md5(data).hexdigest(), mtime
+
+
+def _read_batch(batch: list[tuple[str, concurrent.futures.Future]]) -> None:
+    """
+    Read a group of files in one I/O executor job, resolving each file's future
+    with the result of _read_file (or its exception) as soon as that file is read.
+    """
+    for full_path, future in batch:
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            future.set_result(_read_file(full_path))
+        except Exception as e:
+            future.set_exception(e)
 
 
 EXCLUDE_DIRS = {
@@ -76,6 +105,9 @@ EXT_LANG = {
     "build.gradle": "java-deps",
 }
 
+# Paths containing any of these are indexed as plain text regardless of extension
+_TEXT_PATH_MARKERS = ("LICENSE.md", "__editable__", "_virtualenv.py", "activate_this.py")
+
 CHUNK_SIZE = 800
 CHUNK_OVERLAP = 100
 
@@ -86,10 +118,14 @@ EMBEDDING_TIMEOUT = 15  # Reduced timeout in seconds for each embedding API call
 FILE_PROCESSING_TIMEOUT = 120  # Reduced timeout in seconds for processing a single file (2 minutes)
 
 cpu_count = os.cpu_count() or 1
-_FILE_EXECUTOR_WORKERS = max(2, min(8, cpu_count // 2))
+# File reads get their own pool so disk I/O never occupies the threads that embed and insert
+_IO_EXECUTOR_WORKERS = max(4, min(16, cpu_count * 2))
 _EMBEDDING_EXECUTOR_WORKERS = max(2, min(8, cpu_count // 2))
-_FILE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=_FILE_EXECUTOR_WORKERS)
+_IO_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=_IO_EXECUTOR_WORKERS, thread_name_prefix="picocode-io")
 _EMBEDDING_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=_EMBEDDING_EXECUTOR_WORKERS)
+_FILE_WORKERS = 4
+_MAX_FILES_IN_FLIGHT = _FILE_WORKERS * 4  # Backpressure on the walker
+_READ_BATCH_SIZE = _MAX_FILES_IN_FLIGHT // 2  # Files prefetched per I/O job; must stay below the in-flight cap
 
 logger = get_logger(__name__)
 
@@ -121,6 +157,62 @@ def _should_index_file(rel_path: str, max_file_size: int) -> bool:
     return True
 
 
+def _is_excluded_dir(name: str, exclude_dirs) -> bool:
+    return name in exclude_dirs or name.endswith((".egg-info", ".dist-info"))
+
+
+def _venv_site_packages(venv_path: str) -> list[str]:
+    """
+    Return the site-packages directories of a virtual environment.
+    Only installed packages are worth indexing; bin/, include/ and share/ hold
+    interpreter copies and scripts. Falls back to the venv root if none is found.
+    """
+    roots = glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages")) or glob.glob(os.path.join(venv_path, "Lib", "site-packages"))
+    return roots or [venv_path]
+
+
+def _walk_candidates(root: str, max_file_size: int, exclude_dirs=EXCLUDE_DIRS, rel_root: str | None = None):
+    """
+    Iteratively walk a directory tree and yield indexable files.
+    Uses os.scandir so directory entries carry cached type information; files with an
+    unknown extension are rejected by name before any stat call is made.
+
+    Args:
+        root: Directory to walk
+        max_file_size: Maximum file size in bytes
+        exclude_dirs: Directory names that are not descended into
+        rel_root: Base for relative paths (defaults to root)
+
+    Yields:
+        Tuples of (full_path, rel_path) with rel_path using forward slashes
+    """
+    rel_root = rel_root or root
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _is_excluded_dir(entry.name, exclude_dirs):
+                            stack.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    name = entry.name
+                    if os.path.splitext(name)[1].lower() not in EXT_LANG and name not in EXT_LANG:
+                        continue
+                    if entry.stat(follow_symlinks=False).st_size > max_file_size:
+                        continue
+                except OSError:
+                    continue
+                yield entry.path, os.path.relpath(entry.path, rel_root).replace(os.sep, "/")
+
+
 try:
     _embedding_client = OpenAICompatibleEmbedding()
 except Exception as e:
@@ -168,44 +260,138 @@ def detect_language(path: str):
     "requirements.txt" or "package.json"). If not found, falls back to the
     file extension mapping.
     """
-    if "LICENSE.md" in path:
-        return "text"
-    if "__editable__" in path:
-        return "text"
-    if "_virtualenv.py" in path:
-        return "text"
-    if "activate_this.py" in path:
+    if any(marker in path for marker in _TEXT_PATH_MARKERS):
         return "text"
     filename = os.path.basename(path)
     if filename in EXT_LANG:
         return EXT_LANG[filename]
-    ext = Path(path).suffix.lower()
-    return EXT_LANG.get(ext, "text")
+    return EXT_LANG.get(os.path.splitext(filename)[1].lower(), "text")
+
+
+def _chunk_hash(text: str) -> str:
+    """Content hash of a chunk text, used to reuse embeddings of identical chunks."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@functools.cache
+def _get_node_parser() -> SimpleNodeParser:
+    """Shared chunker; the parser holds only its settings, so one instance serves every file."""
+    return SimpleNodeParser(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+
+def _iter_chunks(content: str, nodes):
+    """
+    Lazily yield (chunk_index, text, start_offset, end_offset) for the non-empty nodes.
+    Falls back to a single chunk spanning the whole content when no node has text.
+    """
+    idx = 0
+    for node in nodes:
+        if node.text:
+            yield idx, node.text, node.start_char_idx, node.end_char_idx
+            idx += 1
+    if idx == 0:
+        yield 0, content, 0, len(content)
+
+
+def _process_candidates(candidates, database_path: str, cfg: dict, label: str = "files") -> tuple[int, int, int]:
+    """
+    Stream (full_path, rel_path) pairs into a worker pool as the walker yields them.
+    At most _MAX_FILES_IN_FLIGHT files are pending at a time, so memory stays bounded
+    and the first embeddings start while the tree is still being walked.
+
+    Args:
+        candidates: Iterable of (full_path, rel_path), usually from _walk_candidates
+        database_path: Path to the SQLite database
+        cfg: Configuration dictionary
+        label: Noun used in progress log lines
+
+    Returns:
+        Tuple of (total_files, total_processed, total_stored)
+    """
+    admission = AdmissionController(EMBEDDING_CONCURRENCY)
+    in_flight = threading.BoundedSemaphore(_MAX_FILES_IN_FLIGHT)
+    lock = threading.Lock()
+    total_files = 0
+    total_processed = 0
+    total_stored = 0
+    worker_threads: set[int] = set()
+
+    def _process_on_worker(*args, **kwargs):
+        worker_threads.add(threading.get_ident())
+        return _process_file_sync(*args, **kwargs)
+
+    def _on_done(future, rel_path):
+        nonlocal total_processed, total_stored
+        in_flight.release()
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Failed to process {rel_path}: {e}")
+            return
+        with lock:
+            total_processed += 1
+            if result and result.get("stored"):
+                total_stored += 1
+            if total_processed % PROGRESS_LOG_INTERVAL == 0:
+                logger.info(f"Processed {total_processed} {label}")
+
+    pending: list[tuple[str, str]] = []
+
+    def _flush(executor):
+        # One I/O job reads the whole group; files are only handed to the workers once
+        # their read is queued, so no worker ever waits on an unsubmitted read
+        batch = [(full, concurrent.futures.Future()) for full, _ in pending]
+        _IO_EXECUTOR.submit(_read_batch, batch)
+        for (full, rel), (_, read_future) in zip(pending, batch, strict=True):
+            future = executor.submit(_process_on_worker, admission, database_path, full, rel, cfg, read_future=read_future)
+            future.add_done_callback(functools.partial(_on_done, rel_path=rel))
+        pending.clear()
+
+    with ThreadPoolExecutor(max_workers=_FILE_WORKERS) as executor:
+        for full, rel in candidates:
+            in_flight.acquire()
+            total_files += 1
+            pending.append((full, rel))
+            if len(pending) >= _READ_BATCH_SIZE:
+                _flush(executor)
+        if pending:
+            _flush(executor)
+
+    # The pool's threads are gone; close the per-thread connections they left behind. Only theirs:
+    # request threads or a concurrent re-index may be in the middle of using their own on this database
+    close_thread_pooled_connections(database_path, worker_threads)
+
+    logger.info(f"Processed {total_processed}/{total_files} {label}")
+    return total_files, total_processed, total_stored
 
 
 def _process_file_sync(
-    semaphore: threading.Semaphore,
+    admission: AdmissionController,
     database_path: str,
     full_path: str,
     rel_path: str,
     cfg: dict,
-    incremental: bool = False,
+    read_future: concurrent.futures.Future | None = None,
 ) -> dict:
     """
     Process a single file: store metadata, chunk, embed, and persist chunks/vectors.
+    A file stored with the same content hash and with chunks is skipped; a full re-index
+    clears the project data beforehand (clear_project_data), so nothing matches there.
+    Embedding requests are gated by admission, which shrinks when a batch comes back
+    incomplete (typically rate limiting) and grows again after complete batches.
+    If read_future is given it must resolve to the result of _read_file(full_path),
+    typically prefetched on _IO_EXECUTOR.
     """
     from llama_index.core import Document
-    from llama_index.core.node_parser import SimpleNodeParser
-    from db.connection import db_connection
-    from db.vector_operations import insert_chunk_vector_with_retry
-    from db.operations import store_file
+    from db.connection import get_pooled_connection
+    from db.vector_operations import copy_chunks_from_duplicate, count_file_chunks, delete_file_chunks, insert_chunk_vectors_bulk, lookup_chunk_embeddings
+    from db.operations import get_file_by_path, set_file_hash, store_file
     from .llama_embeddings import OpenAICompatibleEmbedding
 
     start_time = time.time()
 
     try:
-        with open(full_path, encoding="utf-8", errors="ignore") as fh:
-            content = fh.read()
+        content, file_hash, mtime = read_future.result() if read_future is not None else _read_file(full_path)
     except Exception as e:
         logger.error(f"Failed to read file {full_path}: {e}")
         return {"stored": False, "embedded": False, "skipped": False}
@@ -213,12 +399,19 @@ def _process_file_sync(
     if not content:
         return {"stored": False, "embedded": False, "skipped": True}
 
+    # Unchanged content that already has chunks needs neither re-chunking nor re-embedding
+    existing = get_file_by_path(database_path, rel_path)
+    if existing and existing["file_hash"] == file_hash:
+        if count_file_chunks(get_pooled_connection(database_path, bulk_load=True), existing["id"]):
+            logger.debug(f"Skipping unchanged file {rel_path}")
+            return {"stored": True, "embedded": False, "skipped": True}
+
     lang = detect_language(rel_path)
-    mtime = os.path.getmtime(full_path)
-    file_hash = compute_file_hash(full_path)
 
     try:
-        fid = store_file(database_path, rel_path, content, lang, mtime, file_hash)
+        # The hash is recorded only after every chunk is stored (set_file_hash below): a hash
+        # match is what lets later runs skip this file or copy its chunks to duplicates
+        fid = store_file(database_path, rel_path, lang, mtime, None)
     except Exception:
         logger.exception("Failed to store file %s", rel_path)
         return {"stored": False, "embedded": False, "skipped": False}
@@ -227,41 +420,76 @@ def _process_file_sync(
         logger.error(f"Database error while storing file (file_id is None): {rel_path}")
         return {"stored": False, "embedded": False, "skipped": False}
 
+    # Long-lived per-thread connection: avoids connect + extension load for every DB call of every file
+    conn = get_pooled_connection(database_path, bulk_load=True)
+    copied = 0
+    try:
+        if existing:
+            # Chunks of the previous content would otherwise be returned alongside the new ones
+            delete_file_chunks(conn, fid)
+        copied = copy_chunks_from_duplicate(conn, fid, rel_path, file_hash)
+    except Exception:
+        logger.exception("Failed to reuse or clear chunks for %s", rel_path)
+    if copied:
+        logger.debug(f"Reused {copied} chunks from a file with identical content for {rel_path}")
+        try:
+            set_file_hash(database_path, fid, file_hash)
+        except Exception:
+            logger.exception("Failed to record the content hash of %s", rel_path)
+        return {"stored": True, "embedded": True, "skipped": False}
+
     try:
-        parser = SimpleNodeParser(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
         doc_obj = Document(text=content, extra_info={"path": rel_path, "lang": lang})
-        nodes = parser.get_nodes_from_documents([doc_obj])
-        chunks = [node.text for node in nodes if node.text]
-        if not chunks:
-            chunks = [content]
+        nodes = _get_node_parser().get_nodes_from_documents([doc_obj])
 
         embedded_any = False
-        chunk_tasks = []
-        for idx, chunk in enumerate(chunks):
-            chunk_doc = Document(text=chunk, extra_info={"path": rel_path, "lang": lang, "chunk_index": idx, "chunk_count": len(chunks)})
-            chunk_tasks.append((idx, chunk_doc))
-
-        for batch_start in range(0, len(chunk_tasks), EMBEDDING_BATCH_SIZE):
-            batch = chunk_tasks[batch_start : batch_start + EMBEDDING_BATCH_SIZE]
-            batch_texts = [chunk_doc.text for _, chunk_doc in batch]
-
+        complete = True
+        chunk_iter = _iter_chunks(content, nodes)
+        while batch_chunks := list(itertools.islice(chunk_iter, EMBEDDING_BATCH_SIZE)):
+            batch_hashes = [_chunk_hash(chunk) for _, chunk, _, _ in batch_chunks]
+            # Identical chunk texts (license headers, vendored or generated code) reuse the stored embedding
             try:
-                batch_embeddings = _embedding_client._get_text_embeddings(batch_texts)
-            except Exception as e:
-                logger.exception("Batch embedding generation failed for %s: %s", rel_path, e)
-                batch_embeddings = [None] * len(batch_texts)
+                known = lookup_chunk_embeddings(conn, batch_hashes)
+            except Exception:
+                logger.exception("Chunk embedding lookup failed for %s", rel_path)
+                known = {}
+            batch_texts = list(dict.fromkeys(chunk for (_, chunk, _, _), h in zip(batch_chunks, batch_hashes, strict=True) if h not in known))
+
+            fresh = {}
+            if batch_texts:
+                try:
+                    with admission:
+                        batch_embeddings = _embedding_client._get_text_embeddings(batch_texts)
+                except Exception as e:
+                    logger.exception("Batch embedding generation failed for %s: %s", rel_path, e)
+                    batch_embeddings = [None] * len(batch_texts)
+                if len(batch_embeddings) == len(batch_texts) and all(batch_embeddings):
+                    admission.grow()
+                else:
+                    admission.backoff()
+                    logger.warning(f"Embedding batch incomplete for {rel_path}; embedding concurrency lowered to {admission.limit}")
+                fresh = dict(zip(batch_texts, batch_embeddings, strict=False))
 
-            for (idx, _chunk_doc), emb in zip(batch, batch_embeddings, strict=True):
+            rows = []
+            for (idx, chunk, start, end), h in zip(batch_chunks, batch_hashes, strict=True):
+                emb = known.get(h) or fresh.get(chunk)
                 if emb:
-                    try:
-                        with db_connection(database_path) as conn:
-                            insert_chunk_vector_with_retry(conn, fid, rel_path, idx, emb)
-                        embedded_any = True
-                    except Exception as e:
-                        logger.error(f"Failed to insert embedding into DB for {rel_path} chunk {idx}: {e}")
+                    rows.append((idx, emb, chunk, start, end, h))
                 else:
+                    complete = False
                     logger.error(f"Embedding missing for {rel_path} chunk {idx}")
+            if not rows:
+                continue
+            # One transaction per embedding batch
+            try:
+                insert_chunk_vectors_bulk(conn, fid, rel_path, rows)
+                embedded_any = True
+            except Exception as e:
+                complete = False
+                logger.error(f"Failed to insert embeddings into DB for {rel_path} chunks {rows[0][0]}-{rows[-1][0]}: {e}")
 
+        if complete:
+            set_file_hash(database_path, fid, file_hash)
         return {"stored": True, "embedded": embedded_any, "skipped": False}
     except AttributeError as e:
         if "nltk" in str(e).lower() or "punkt" in str(e).lower() or "stopwords" in str(e).lower():
@@ -280,7 +508,6 @@ def analyze_local_path_sync(
     venv_path: str | None = None,
     max_file_size: int = 200000,
     cfg: dict | None = None,
-    incremental: bool = False,
 ) -> tuple:
     """
     Synchronous version to analyze and index a local path.
@@ -291,120 +518,28 @@ def analyze_local_path_sync(
         venv_path: Path to virtual environment (optional)
         max_file_size: Maximum file size to process
         cfg: Configuration dictionary
-        incremental: Whether to perform incremental indexing
 
     Returns:
-        Tuple of (index, excluded_paths)
+        Tuple of (None, excluded_paths); the index lives in the database, the first
+        element is kept for callers that unpack the legacy (index, excluded_paths) pair
     """
     import time
 
     start_time = time.time()
     logger.info(f"Starting synchronous analysis of {local_path}")
 
-    # Reuse the existing implementation from analyze_local_path_background
-    # but adapted for synchronous execution
-    from llama_index.core import Document, VectorStoreIndex
-    from llama_index.core.node_parser import SimpleNodeParser
-    from llama_index.core.vector_stores.simple import SimpleVectorStore
-    from ai.llama_embeddings import OpenAICompatibleEmbedding
-    from db.operations import set_project_metadata, store_file
-    import json
-
     excluded_paths = []
-    file_paths = []
     local_path = str(Path(local_path).resolve())
 
-    for root, dirs, files in os.walk(local_path):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        for f in files:
-            full = os.path.join(root, f)
-            rel = os.path.relpath(full, local_path).replace(os.sep, "/")
-            if _should_index_file(rel, max_file_size):
-                file_paths.append({"full": full, "rel": rel})
-
-    # Separate project files from dependencies
-    project_files = []
-    dep_files = []
-    for entry in file_paths:
-        rel_path = entry["rel"].replace(os.sep, "/")
-        if ".git/" not in rel_path:
-            if ".venv/" in rel_path or "node_modules/" in rel_path:
-                dep_files.append(entry)
-            else:
-                project_files.append(entry)
-
-    # By default, only index project files
-    file_paths = project_files
-    total_files = len(file_paths)
-    logger.info(f"Found {total_files} files to index (project files only)")
-
-    # Process files in parallel using ThreadPoolExecutor
-    semaphore = threading.Semaphore(EMBEDDING_CONCURRENCY)
-    batch_size = 10
-    total_processed = 0
-
-    def process_file_batch(file_batch):
-        """Process a batch of files."""
-        results = []
-        for f in file_batch:
-            try:
-                result = _process_file_sync(
-                    semaphore,
-                    database_path,
-                    f["full"],
-                    f["rel"],
-                    cfg or {},
-                    incremental=incremental,
-                )
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Failed to process {f['rel']}: {e}")
-                results.append(None)
-        return results
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = []
-        for i in range(0, len(file_paths), batch_size):
-            batch = file_paths[i : i + batch_size]
-            future = executor.submit(process_file_batch, batch)
-            futures.append(future)
-
-        for future in as_completed(futures):
-            try:
-                results = future.result()
-                total_processed += len([r for r in results if r is not None])
-                logger.info(f"Processed {total_processed}/{total_files} files")
-            except Exception as e:
-                logger.error(f"Batch processing error: {e}")
+    # Dependency directories (.venv, node_modules) are pruned by the walker,
+    # so only project files are processed here. Chunks and embeddings are persisted
+    # per file as they are processed; no second in-memory index is built.
+    total_files, total_processed, files_indexed = _process_candidates(_walk_candidates(local_path, max_file_size), database_path, cfg or {})
 
     logger.info(f"Completed processing {total_processed} files for embedding")
 
-    # Create documents for indexing
-    documents: list[Document] = []
-    for f in file_paths:
-        try:
-            with open(f["full"], encoding="utf-8", errors="ignore") as fh:
-                content = fh.read()
-            if not content:
-                continue
-            lang = detect_language(f["rel"])
-            doc = Document(text=content, extra_info={"path": f["rel"], "lang": lang})
-            documents.append(doc)
-        except Exception:
-            logger.exception("Failed to read %s", f["full"])
-
-    vector_store = SimpleVectorStore()
-    embed_model = OpenAICompatibleEmbedding()
-    parser = SimpleNodeParser(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
-    index = VectorStoreIndex.from_documents(
-        documents,
-        vector_store=vector_store,
-        embed_model=embed_model,
-        node_parser=parser,
-    )
-
     duration = time.time() - start_time
-    logger.info(f"Indexing completed: {len(documents)} documents indexed in {duration:.2f}s")
+    logger.info(f"Indexing completed: {files_indexed} documents indexed in {duration:.2f}s")
 
     try:
         from db.operations import set_project_metadata_batch
@@ -414,14 +549,19 @@ def analyze_local_path_sync(
             {
                 "last_indexed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
                 "last_index_duration": str(duration),
-                "files_indexed": str(len(documents)),
+                "files_indexed": str(files_indexed),
                 "total_files": str(total_files),
             },
         )
     except Exception:
         logger.exception("Failed to store indexing metadata")
 
-    return index, excluded_paths
+    if files_indexed:
+        from db.operations import optimize_database
+
+        optimize_database(database_path)
+
+    return None, excluded_paths
 
 
 def analyze_local_path_background(local_path: str, database_path: str, venv_path: str | None = None, max_file_size: int = 200000, cfg: dict | None = None):
@@ -486,7 +626,6 @@ def analyze_dependencies_sync(
     venv_path: str | None,
     max_file_size: int,
     cfg: dict,
-    incremental: bool = False,
 ) -> None:
     """
     Index direct dependencies (Phase 2).
@@ -499,7 +638,6 @@ def analyze_dependencies_sync(
         venv_path: Path to virtual environment (if applicable)
         max_file_size: Maximum file size to process
         cfg: Configuration dictionary
-        incremental: Whether to perform incremental indexing
     """
     import time
 
@@ -507,76 +645,25 @@ def analyze_dependencies_sync(
     logger.info(f"Starting Phase 2: Indexing direct dependencies for {local_path}")
 
     # Collect dependency files only
-    file_paths = []
+    candidates = []
 
     # Python dependencies in .venv
     if venv_path and os.path.exists(venv_path):
-        for root, dirs, files in os.walk(venv_path):
-            # Skip non-essential directories
-            dirs[:] = [d for d in dirs if d not in {"__pycache__", ".git", "test", "tests"}]
-            for f in files:
-                full = os.path.join(root, f)
-                rel = os.path.relpath(full, local_path).replace(os.sep, "/")
-                if _should_index_file(rel, max_file_size):
-                    file_paths.append({"full": full, "rel": rel})
+        # Skip non-essential directories
+        for site_packages in _venv_site_packages(venv_path):
+            candidates.append(_walk_candidates(site_packages, max_file_size, exclude_dirs={"__pycache__", ".git", "test", "tests"}, rel_root=local_path))
 
     # Node.js dependencies
     node_modules = os.path.join(local_path, "node_modules")
     if os.path.exists(node_modules):
-        for root, dirs, files in os.walk(node_modules):
-            # Skip non-essential directories
-            dirs[:] = [d for d in dirs if d not in {".git", "test", "tests", "docs"}]
-            for f in files:
-                full = os.path.join(root, f)
-                rel = os.path.relpath(full, local_path).replace(os.sep, "/")
-                if _should_index_file(rel, max_file_size):
-                    file_paths.append({"full": full, "rel": rel})
-
-    total_files = len(file_paths)
-    logger.info(f"Found {total_files} dependency files to index")
+        # Skip non-essential directories
+        candidates.append(_walk_candidates(node_modules, max_file_size, exclude_dirs={".git", "test", "tests", "docs"}, rel_root=local_path))
+
+    total_files, total_processed, _ = _process_candidates(itertools.chain.from_iterable(candidates), database_path, cfg, label="dependency files")
 
     if total_files == 0:
         logger.info("No dependency files to index")
         return
 
-    # Process files in parallel batches
-    semaphore = threading.Semaphore(EMBEDDING_CONCURRENCY)
-    batch_size = 10
-    total_processed = 0
-
-    def process_file_batch(file_batch):
-        """Process a batch of dependency files."""
-        results = []
-        for f in file_batch:
-            try:
-                result = _process_file_sync(
-                    semaphore,
-                    database_path,
-                    f["full"],
-                    f["rel"],
-                    cfg,
-                    incremental=incremental,
-                )
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Failed to process dependency {f['rel']}: {e}")
-                results.append(None)
-        return results
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = []
-        for i in range(0, len(file_paths), batch_size):
-            batch = file_paths[i : i + batch_size]
-            future = executor.submit(process_file_batch, batch)
-            futures.append(future)
-
-        for future in as_completed(futures):
-            try:
-                results = future.result()
-                total_processed += len([r for r in results if r is not None])
-                logger.info(f"Indexed {total_processed}/{total_files} dependency files")
-            except Exception as e:
-                logger.error(f"Dependency batch processing error: {e}")
-
     elapsed = time.time() - start_time
     logger.info(f"Phase 2 complete: Indexed {total_processed}/{total_files} dependency files in {elapsed:.1f}s")
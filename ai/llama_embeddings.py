@@ -10,8 +10,24 @@ from openai import OpenAI
 from utils.config import CFG
 from utils.logger import get_logger
 
+from .openai import get_openai_client
+
 logger = get_logger(__name__)
 
+# Inputs longer than this are clipped to their head and tail before embedding. Code often
+# tokenizes at ~3 characters per token, so 24k characters stays under the 8,191-token input
+# limit; one oversized input would otherwise fail its whole batch
+MAX_EMBED_CHARS = 24000
+
+
+def _prepare_text(text: str) -> str:
+    """Normalize an embedding input and clip it to MAX_EMBED_CHARS."""
+    text = text.replace("\n", " ").strip()
+    if len(text) > MAX_EMBED_CHARS:
+        half = MAX_EMBED_CHARS // 2
+        text = f"{text[:half]} ... {text[-half:]}"
+    return text
+
 
 class OpenAICompatibleEmbedding(BaseEmbedding):
     """
@@ -33,7 +49,7 @@ class OpenAICompatibleEmbedding(BaseEmbedding):
         """
         super().__init__(**kwargs)
 
-        self._client = OpenAI(api_key=api_key or CFG.get("api_key"), base_url=api_base or CFG.get("api_url"))
+        self._client = get_openai_client(api_key, api_base)
         self._model = model or CFG.get("embedding_model") or "text-embedding-3-small"
 
         if not getattr(self.__class__, "_init_logged", False):
@@ -59,7 +75,7 @@ class OpenAICompatibleEmbedding(BaseEmbedding):
     def _get_text_embedding(self, text: str) -> list[float]:
         """Get embedding for a text."""
         try:
-            text = text.replace("\n", " ").strip()
+            text = _prepare_text(text)
             if not text:
                 logger.warning("Empty text provided for embedding")
                 return []
@@ -83,9 +99,28 @@ class OpenAICompatibleEmbedding(BaseEmbedding):
             return []
 
     def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
-        """Get embeddings for multiple texts."""
-        embeddings = []
-        for text in texts:
-            embedding = self._get_text_embedding(text)
-            embeddings.append(embedding)
+        """
+        Get embeddings for multiple texts with a single API request.
+        Returns one entry per input text, in order; empty texts and failures yield [].
+        """
+        cleaned = [_prepare_text(text) for text in texts]
+        positions = [i for i, text in enumerate(cleaned) if text]
+        embeddings: list[list[float]] = [[] for _ in texts]
+        if not positions:
+            logger.warning("Empty texts provided for embedding")
+            return embeddings
+
+        try:
+            response = self._client.embeddings.create(input=[cleaned[i] for i in positions], model=self._model)
+        except Exception as e:
+            logger.exception(f"Failed to generate batch embeddings: {e}")
+            return embeddings
+
+        for item in response.data or []:
+            if 0 <= item.index < len(positions):
+                embeddings[positions[item.index]] = item.embedding
+        if response.data:
+            logger.info(f"Generated {len(response.data)} embeddings (dim {len(response.data[0].embedding)})")
+        else:
+            logger.error("No embeddings returned from API")
         return embeddings
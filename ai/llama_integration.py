@@ -6,6 +6,7 @@ Provides RAG functionality using llama-index with sqlite-vector backend.
 from llama_index.core import Document
 
 from db.vector_operations import get_chunk_text, search_vectors
+from utils.cache import embedding_cache
 from utils.logger import get_logger
 
 from .llama_embeddings import OpenAICompatibleEmbedding
@@ -15,6 +16,21 @@ logger = get_logger(__name__)
 _embedding_client = OpenAICompatibleEmbedding()
 
 
+def _get_query_embedding_cached(query: str) -> list[float]:
+    """
+    Embed a search query, reusing the result for repeated queries with the same model.
+    Empty results (failed API calls) are not cached.
+    """
+    cache_key = f"{_embedding_client._model}:{query}"
+    cached = embedding_cache.get(cache_key)
+    if cached is not None:
+        return list(cached)
+    q_emb = _embedding_client._get_query_embedding(query)
+    if q_emb:
+        embedding_cache.set(cache_key, tuple(q_emb))
+    return q_emb
+
+
 def llama_index_search(query: str, database_path: str, top_k: int = 5) -> list[Document]:
     """
     Perform semantic search using llama-index with sqlite-vector backend.
@@ -28,7 +44,7 @@ def llama_index_search(query: str, database_path: str, top_k: int = 5) -> list[D
         List of Document objects with chunk text and metadata
     """
     try:
-        q_emb = _embedding_client._get_query_embedding(query)
+        q_emb = _get_query_embedding_cached(query)
         if not q_emb:
             logger.warning("Failed to generate query embedding")
             return []
@@ -41,7 +57,8 @@ def llama_index_search(query: str, database_path: str, top_k: int = 5) -> list[D
             path = result.get("path")
             chunk_index = result.get("chunk_index")
             score = result.get("score")
-            chunk_text = get_chunk_text(database_path, file_id, chunk_index)
+            # Text comes back with the vector scan; only legacy rows need the per-chunk lookup
+            chunk_text = result.get("text") or get_chunk_text(database_path, file_id, chunk_index)
             if not chunk_text:
                 continue
             doc = Document(
@@ -1,3 +1,4 @@
+import functools
 import logging
 import threading
 import time
@@ -6,8 +7,23 @@ from openai import OpenAI
 
 from utils.config import CFG
 
+
+@functools.lru_cache(maxsize=8)
+def get_openai_client(api_key: str | None = None, base_url: str | None = None) -> OpenAI:
+    """
+    Return the process-wide OpenAI client for an endpoint.
+    The client keeps a pool of keep-alive HTTP connections, so sharing one instance
+    avoids a new TCP + TLS handshake for every embedding or completion call.
+
+    Args:
+        api_key: API key (defaults to config)
+        base_url: API base URL (defaults to config)
+    """
+    return OpenAI(api_key=api_key or CFG.get("api_key"), base_url=base_url or CFG.get("api_url"))
+
+
 try:
-    _client = OpenAI(api_key=CFG.get("api_key"), base_url=CFG.get("api_url"))
+    _client = get_openai_client()
 except Exception as e:
     _client = None
     _embedding_logger = logging.getLogger("ai.analyzer.embedding")
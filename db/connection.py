@@ -4,6 +4,7 @@ Provides consistent connection management across all database operations.
 """
 
 import os
+import queue
 import sqlite3
 import threading
 from contextlib import contextmanager
@@ -16,6 +17,53 @@ logger = get_logger(__name__)
 _connection_pool = {}
 _pool_lock = threading.Lock()
 
+# Long-lived read-only connections per database, shared by concurrent searches
+READ_POOL_SIZE = 4
+_read_pools: dict[str, queue.Queue] = {}
+_read_pools_lock = threading.Lock()
+
+# journal_mode=WAL is persistent in the database file, so it only needs to be set once per path
+_WAL_DATABASES: set[str] = set()
+_WAL_LOCK = threading.Lock()
+
+# Databases whose schema init_db has already ensured in this process (guarded by _WAL_LOCK)
+_SCHEMA_READY: set[str] = set()
+
+# Parsed statements kept per connection by sqlite3 (default 128); pooled and writer connections
+# live long and cycle through the chunk, stats, metadata, registry and dependency SQL
+STATEMENT_CACHE_SIZE = 256
+
+# Per-connection tuning for WAL databases: no fsync on every commit (only at checkpoints),
+# temp b-trees in memory, 256 MiB of mmap'd reads and a 64 MiB page cache
+_WAL_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA mmap_size = 268435456;",
+    "PRAGMA cache_size = -65536;",
+    "PRAGMA wal_autocheckpoint = 1000;",
+)
+
+# Extra tuning for connections that only bulk-load chunks during indexing: checkpoint
+# less often so the WAL absorbs bursts of inserts instead of copying back every 1000 pages,
+# and truncate the WAL file back to 64 MiB after checkpoints so it cannot grow unbounded.
+# With synchronous=NORMAL a power loss can drop the last commits but never corrupts the database.
+BULK_LOAD_PRAGMAS = (
+    "PRAGMA wal_autocheckpoint = 10000;",
+    "PRAGMA journal_size_limit = 67108864;",
+)
+
+# DBWriter connections: the same per-connection tuning as other WAL connections, but automatic
+# checkpoints are off (the writer checkpoints when idle, so no queued write pays for one) and
+# the WAL file is truncated back to 64 MiB after those checkpoints.
+WRITER_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA mmap_size = 268435456;",
+    "PRAGMA cache_size = -65536;",
+    "PRAGMA wal_autocheckpoint = 0;",
+    "PRAGMA journal_size_limit = 67108864;",
+)
+
 
 def _ensure_vector_extension(conn: sqlite3.Connection) -> None:
     """
@@ -27,7 +75,19 @@ def _ensure_vector_extension(conn: sqlite3.Connection) -> None:
     load_sqlite_vector_extension(conn)
 
 
-def get_db_connection(db_path: str, timeout: float = 30.0, enable_wal: bool = True, row_factory: bool = True) -> sqlite3.Connection:
+class ReadConnection(sqlite3.Connection):
+    """
+    Connection subclass used by the read pool.
+    Unlike plain sqlite3.Connection it accepts attributes, so per-connection state
+    (such as the vector_init parameters already applied) can live on the connection.
+    """
+
+    vector_context: tuple | None = None
+
+
+def get_db_connection(
+    db_path: str, timeout: float = 30.0, enable_wal: bool = True, row_factory: bool = True, factory: type[sqlite3.Connection] = sqlite3.Connection
+) -> sqlite3.Connection:
     """
     Create a database connection with consistent configuration.
 
@@ -37,6 +97,7 @@ def get_db_connection(db_path: str, timeout: float = 30.0, enable_wal: bool = Tr
         enable_wal: Enable Write-Ahead Logging mode (default: True)
         (always loads vector extension)
         row_factory: Use sqlite3.Row factory for dict-like access (default: True)
+        factory: sqlite3.Connection subclass to instantiate
 
     Returns:
         sqlite3.Connection object configured for the specified operations
@@ -48,16 +109,14 @@ def get_db_connection(db_path: str, timeout: float = 30.0, enable_wal: bool = Tr
     if dirname and not os.path.isdir(dirname):
         os.makedirs(dirname, exist_ok=True)
 
-    conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False)
+    conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False, factory=factory, cached_statements=STATEMENT_CACHE_SIZE)
 
     if row_factory:
         conn.row_factory = sqlite3.Row
 
     if enable_wal:
-        try:
-            conn.execute("PRAGMA journal_mode = WAL;")
-        except Exception as e:
-            logger.warning(f"Failed to enable WAL mode: {e}")
+        _enable_wal(conn, db_path)
+        apply_pragmas(conn, _WAL_CONNECTION_PRAGMAS)
 
     try:
         conn.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)};")
@@ -69,7 +128,56 @@ def get_db_connection(db_path: str, timeout: float = 30.0, enable_wal: bool = Tr
     return conn
 
 
-def get_pooled_connection(db_path: str, timeout: float = 30.0, enable_wal: bool = True) -> sqlite3.Connection:
+def _enable_wal(conn: sqlite3.Connection, db_path: str) -> None:
+    """Switch the database to WAL mode the first time it is opened by this process."""
+    if db_path in _WAL_DATABASES:
+        return
+    try:
+        mode = conn.execute("PRAGMA journal_mode = WAL;").fetchone()
+    except Exception as e:
+        logger.warning(f"Failed to enable WAL mode: {e}")
+        return
+    if mode and str(mode[0]).lower() == "wal":
+        with _WAL_LOCK:
+            _WAL_DATABASES.add(db_path)
+
+
+def schema_ready(db_path: str) -> bool:
+    """Whether init_db already ensured the schema of db_path in this process."""
+    return db_path in _SCHEMA_READY
+
+
+def mark_schema_ready(db_path: str, ready: bool = True) -> None:
+    """Record (or, with ready=False, forget) that the schema of db_path is in place."""
+    with _WAL_LOCK:
+        if ready:
+            _SCHEMA_READY.add(db_path)
+        else:
+            _SCHEMA_READY.discard(db_path)
+
+
+def forget_database(db_path: str) -> None:
+    """
+    Drop per-process state remembered about a database file.
+    Must be called when the file is deleted so a recreated database is set up from scratch.
+    """
+    with _WAL_LOCK:
+        _WAL_DATABASES.discard(db_path)
+        _SCHEMA_READY.discard(db_path)
+    _close_read_pool(db_path)
+    close_database_pooled_connections(db_path)
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas) -> None:
+    """Execute each PRAGMA statement, logging (not raising) the ones SQLite rejects."""
+    for pragma in pragmas:
+        try:
+            conn.execute(pragma)
+        except Exception as e:
+            logger.warning(f"Failed to apply {pragma} {e}")
+
+
+def get_pooled_connection(db_path: str, timeout: float = 30.0, enable_wal: bool = True, bulk_load: bool = False) -> sqlite3.Connection:
     """
     Get a connection from the pool or create a new one.
     Connections are thread-local and reused within the same thread.
@@ -78,6 +186,7 @@ def get_pooled_connection(db_path: str, timeout: float = 30.0, enable_wal: bool
         db_path: Path to the SQLite database file
         timeout: Timeout in seconds for waiting on locks
         enable_wal: Enable Write-Ahead Logging mode
+        bulk_load: Apply BULK_LOAD_PRAGMAS when the connection is created (indexing threads)
 
     Returns:
         sqlite3.Connection object from the pool or newly created
@@ -89,11 +198,26 @@ def get_pooled_connection(db_path: str, timeout: float = 30.0, enable_wal: bool
         conn = _connection_pool.get(pool_key)
         if conn is None or _is_connection_closed(conn):
             conn = get_db_connection(db_path, timeout=timeout, enable_wal=enable_wal)
+            if bulk_load and enable_wal:
+                apply_pragmas(conn, BULK_LOAD_PRAGMAS)
             _connection_pool[pool_key] = conn
 
     return conn
 
 
+def release_pooled_connection(conn: sqlite3.Connection) -> None:
+    """
+    Hand a connection from get_pooled_connection back after use.
+    The connection stays open for the next call on this thread; a transaction left
+    open by an error path is rolled back so it cannot leak into that call.
+    """
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        pass
+
+
 def _is_connection_closed(conn: sqlite3.Connection) -> bool:
     """Check if a connection is closed or invalid."""
     try:
@@ -117,6 +241,31 @@ def close_pooled_connection(db_path: str) -> None:
                 pass
 
 
+def close_database_pooled_connections(db_path: str) -> None:
+    """Close the pooled connections of every thread for one database."""
+    with _pool_lock:
+        keys = [key for key in _connection_pool if key[1] == db_path]
+        conns = [_connection_pool.pop(key) for key in keys]
+    for conn in conns:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def close_thread_pooled_connections(db_path: str, thread_ids) -> None:
+    """Close the pooled connections that the given threads opened for one database."""
+    with _pool_lock:
+        conns = [_connection_pool.pop((thread_id, db_path), None) for thread_id in thread_ids]
+    for conn in conns:
+        if conn is None:
+            continue
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 def close_all_pooled_connections() -> None:
     """Close all connections in the pool."""
     with _pool_lock:
@@ -126,6 +275,79 @@ def close_all_pooled_connections() -> None:
             except Exception:
                 pass
         _connection_pool.clear()
+    with _read_pools_lock:
+        paths = list(_read_pools)
+    for path in paths:
+        _close_read_pool(path)
+
+
+def _get_read_pool(db_path: str) -> queue.Queue:
+    with _read_pools_lock:
+        pool = _read_pools.get(db_path)
+        if pool is None:
+            pool = queue.Queue(maxsize=READ_POOL_SIZE)
+            _read_pools[db_path] = pool
+        return pool
+
+
+def _close_read_pool(db_path: str) -> None:
+    with _read_pools_lock:
+        pool = _read_pools.pop(db_path, None)
+    if pool is None:
+        return
+    while True:
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@contextmanager
+def read_connection(db_path: str, timeout: float = 30.0):
+    """
+    Context manager yielding a pooled read-only connection (PRAGMA query_only).
+    Up to READ_POOL_SIZE idle connections are kept per database with the vector extension
+    already loaded, so concurrent searches run in parallel under WAL without paying
+    for connect + extension load on every request.
+
+    Args:
+        db_path: Path to the SQLite database file
+        timeout: Timeout in seconds for waiting on locks
+
+    Yields:
+        ReadConnection object
+    """
+    pool = _get_read_pool(db_path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = get_db_connection(db_path, timeout=timeout, factory=ReadConnection)
+        conn.execute("PRAGMA query_only = 1;")
+    try:
+        yield conn
+    finally:
+        returned = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            # A pool dropped by forget_database (database deleted) is never drained again, and an open
+            # handle would keep the deleted file alive. Checked under the lock _close_read_pool pops with.
+            with _read_pools_lock:
+                if _read_pools.get(db_path) is pool:
+                    pool.put_nowait(conn)
+                    returned = True
+        except Exception:
+            # Pool full, or the connection is no longer usable
+            pass
+        if not returned:
+            try:
+                conn.close()
+            except Exception:
+                pass
 
 
 @contextmanager
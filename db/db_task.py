@@ -6,9 +6,18 @@ import threading
 
 class _DBTask:
     """Internal task class for queuing database write operations."""
-    def __init__(self, sql, params):
+
+    __slots__ = ("sql", "params", "event", "rowid", "exception")
+
+    def __init__(self, sql, params, wait=True):
         self.sql = sql
         self.params = params
-        self.event = threading.Event()
+        # Fire-and-forget tasks have no waiter, so they skip the Event (and its lock) entirely
+        self.event = threading.Event() if wait else None
         self.rowid = None
         self.exception = None
+
+    def done(self):
+        """Wake the waiter, if any; rowid/exception must be set before calling."""
+        if self.event is not None:
+            self.event.set()
@@ -4,34 +4,89 @@ Provides thread-safe database write access through a single-writer thread.
 """
 
 import atexit
+import functools
 import os
 import queue
 import sqlite3
 import threading
+import time
 
 from utils.logger import get_logger
 
+from .connection import STATEMENT_CACHE_SIZE, WRITER_PRAGMAS, apply_pragmas
 from .db_task import _DBTask
 
 _LOG = get_logger(__name__)
 
+# Upper bound on queued writes committed together in one transaction
+BATCH_MAX_TASKS = 256
+
+# Writer connections never auto-checkpoint; an idle worker checkpoints at most this often (seconds)
+IDLE_CHECKPOINT_INTERVAL = 1.0
+
+# A worker with nothing to write for this long closes its connection and exits; the next
+# write starts a fresh one, so only databases that are actually being written hold threads
+IDLE_EXIT_SECONDS = 30.0
+
 _WRITERS = {}
 _WRITERS_LOCK = threading.Lock()
 
 
+@functools.lru_cache(maxsize=128)
+def _has_returning(sql: str) -> bool:
+    """Whether a statement yields a RETURNING row (writers reuse a handful of SQL strings)."""
+    return "RETURNING" in sql.upper()
+
+
 class DBWriter:
     def __init__(self, database_path, timeout_seconds=30, num_workers: int = 1):
         self.database_path = database_path
-        self._q = queue.Queue()
+        # C-implemented FIFO: no Python-level locks or unfinished-task bookkeeping per put/get
+        self._q = queue.SimpleQueue()
         self._stop = threading.Event()
         self._workers: list[threading.Thread] = []
         self._timeout_seconds = timeout_seconds
         self._num_workers = max(1, num_workers)
-        for i in range(self._num_workers):
-            worker = threading.Thread(target=self._worker, daemon=False, name=f"DBWriter-{database_path}-worker{i + 1}")
-            worker.start()
-            self._workers.append(worker)
-        _LOG.info(f"DBWriter started for database: {database_path} with {self._num_workers} worker(s)")
+        self._checkpoint_lock = threading.Lock()
+        self._wal_dirty = False
+        self._last_checkpoint = 0.0
+        # Workers are started by the first writes and retire when idle (see _ensure_workers/_retire)
+        self._workers_lock = threading.Lock()
+        self._live_workers = 0
+        self._started_workers = 0
+        _LOG.info(f"DBWriter created for database: {database_path} with up to {self._num_workers} worker(s)")
+
+    def _ensure_workers(self):
+        """
+        Start workers until num_workers are running. Called after every put: a worker only
+        retires after decrementing _live_workers and then finding the queue empty, so a task
+        put before that check is processed, and one put after it sees the lowered count here.
+        """
+        if self._live_workers >= self._num_workers:
+            return
+        with self._workers_lock:
+            if self._stop.is_set():
+                return
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while self._live_workers < self._num_workers:
+                self._live_workers += 1
+                self._started_workers += 1
+                worker = threading.Thread(target=self._worker, daemon=False, name=f"DBWriter-{self.database_path}-worker{self._started_workers}")
+                self._workers.append(worker)
+                worker.start()
+
+    def _retire(self):
+        """Give up this worker's slot unless tasks are waiting. Returns True if the worker should exit."""
+        with self._workers_lock:
+            self._live_workers -= 1
+            if self._q.empty() or self._stop.is_set():
+                return True
+            self._live_workers += 1
+            return False
+
+    def _put(self, task):
+        self._q.put(task)
+        self._ensure_workers()
 
     def _open_conn(self):
         # Ensure parent directory exists
@@ -42,25 +97,27 @@ class DBWriter:
             except Exception as e:
                 _LOG.warning(f"Could not create database directory: {e}")
 
-        conn = sqlite3.connect(self.database_path, timeout=self._timeout_seconds, check_same_thread=False)
+        conn = sqlite3.connect(self.database_path, timeout=self._timeout_seconds, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
         try:
-            conn.execute("PRAGMA journal_mode=WAL;")
+            mode = conn.execute("PRAGMA journal_mode=WAL;").fetchone()
+            if not mode or str(mode[0]).lower() != "wal":
+                # WAL mode may not work on all filesystems (e.g., NFS)
+                _LOG.warning(f"WAL mode not active for {self.database_path} (journal_mode={mode[0] if mode else None})")
         except sqlite3.OperationalError as e:
-            # WAL mode may not work on all filesystems (e.g., tmpfs, NFS)
             _LOG.warning(f"Could not enable WAL mode (continuing without): {e}")
         conn.execute("PRAGMA busy_timeout = 30000;")
-        conn.execute("PRAGMA synchronous = NORMAL;")
+        # Checkpoints are left to idle moments (_checkpoint_if_idle) so no queued write pays for one
+        apply_pragmas(conn, WRITER_PRAGMAS)
         _LOG.debug(f"Database connection opened for: {self.database_path}")
         return conn
 
     def _worker(self):
         conn = None
+        retired = False
         try:
             # Check if database file exists before trying to connect
             if not os.path.exists(self.database_path):
                 # Wait briefly to see if database is being created
-                import time
-
                 time.sleep(0.5)
                 if not os.path.exists(self.database_path):
                     _LOG.warning(f"Database does not exist, worker stopping: {self.database_path}")
@@ -71,63 +128,167 @@ class DBWriter:
                             if task is None:
                                 break
                             task.exception = sqlite3.OperationalError(f"Database does not exist: {self.database_path}")
-                            task.event.set()
-                            self._q.task_done()
+                            task.done()
                         except queue.Empty:
-                            continue
+                            if self._retire():
+                                retired = True
+                                break
                     return
 
             conn = self._open_conn()
             cur = conn.cursor()
+            idle_since = time.monotonic()
             while not self._stop.is_set():
                 try:
                     task = self._q.get(timeout=0.5)
                 except queue.Empty:
+                    self._checkpoint_if_idle(conn)
+                    if time.monotonic() - idle_since >= IDLE_EXIT_SECONDS and not self._wal_dirty and self._retire():
+                        retired = True
+                        break
                     continue
                 if task is None:
                     break
+                batch, stop_after = self._drain(task)
                 if not os.path.exists(self.database_path):
                     # Database was deleted while running
-                    task.exception = sqlite3.OperationalError(f"Database was deleted: {self.database_path}")
-                    task.event.set()
-                    self._q.task_done()
+                    for t in batch:
+                        t.exception = sqlite3.OperationalError(f"Database was deleted: {self.database_path}")
+                        t.done()
+                    break
+                self._run_batch(conn, cur, batch)
+                self._wal_dirty = True
+                idle_since = time.monotonic()
+                if stop_after:
                     break
-                try:
-                    cur.execute(task.sql, task.params)
-                    # Handle RETURNING clause - must fetch before commit
-                    if "RETURNING" in task.sql.upper():
-                        result = cur.fetchone()
-                        task.rowid = result[0] if result else None
-                        conn.commit()
-                    else:
-                        conn.commit()
-                        task.rowid = cur.lastrowid
-                except Exception as e:
-                    task.exception = e
-                    try:
-                        conn.rollback()
-                    except Exception:
-                        pass
-                    _LOG.exception("Error executing DB task")
-                finally:
-                    task.event.set()
-                    self._q.task_done()
         except Exception:
             _LOG.exception("DBWriter thread initialization failed")
         finally:
+            if not retired:
+                with self._workers_lock:
+                    self._live_workers -= 1
             if conn:
+                if os.path.exists(self.database_path):
+                    # Recommended before closing: re-analyzes only tables whose statistics went stale
+                    apply_pragmas(conn, ("PRAGMA optimize;",))
                 try:
                     conn.close()
                 except Exception:
                     pass
 
+    def _checkpoint_if_idle(self, conn):
+        """
+        Copy committed WAL frames back into the database while the queue is empty.
+        PASSIVE mode never waits on readers or writers, so an idle checkpoint cannot
+        hold up the next write; frames still in use are simply left for the next round.
+        """
+        now = time.monotonic()
+        with self._checkpoint_lock:
+            if not self._wal_dirty or now - self._last_checkpoint < IDLE_CHECKPOINT_INTERVAL:
+                return
+            self._wal_dirty = False
+            self._last_checkpoint = now
+        try:
+            busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(PASSIVE);").fetchone()
+            _LOG.debug(f"Idle checkpoint of {self.database_path}: busy={busy} wal_frames={log_frames} checkpointed={checkpointed}")
+            if checkpointed < log_frames:
+                self._wal_dirty = True
+        except sqlite3.Error as e:
+            self._wal_dirty = True
+            _LOG.debug(f"Idle checkpoint of {self.database_path} failed: {e}")
+
+    def _drain(self, first):
+        """
+        Collect the tasks already waiting behind first, up to BATCH_MAX_TASKS.
+        Nothing waits for more work to arrive: under load the queue fills while the
+        previous commit runs, so batches grow exactly when amortizing the commit pays off.
+
+        Returns:
+            Tuple of (tasks, stop_after) where stop_after is True if a stop sentinel was taken
+        """
+        batch = [first]
+        while len(batch) < BATCH_MAX_TASKS:
+            try:
+                task = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if task is None:
+                return batch, True
+            batch.append(task)
+        return batch, False
+
+    @staticmethod
+    def _execute_task(cur, task):
+        if task.sql is None:
+            # Script task: params holds (sql, params) pairs; a list of parameter tuples runs with executemany
+            for sql, params in task.params:
+                if isinstance(params, list):
+                    cur.executemany(sql, params)
+                else:
+                    cur.execute(sql, params)
+            task.rowid = None
+            return
+        cur.execute(task.sql, task.params)
+        # Handle RETURNING clause - must fetch before commit
+        if _has_returning(task.sql):
+            result = cur.fetchone()
+            task.rowid = result[0] if result else None
+        else:
+            task.rowid = cur.lastrowid
+
+    def _run_batch(self, conn, cur, batch):
+        """
+        Execute a batch of tasks in one transaction so a single commit (and WAL sync)
+        covers all of them. If any task fails the transaction is rolled back and the
+        tasks are replayed one per transaction, so only the failing task gets the error.
+        Waiters are released only after their write is committed.
+        Script tasks always get an explicit BEGIN IMMEDIATE: sqlite3's implicit transaction
+        only opens at the first DML statement, so leading DDL or PRAGMAs would otherwise
+        autocommit and survive a later failure.
+        """
+        try:
+            if len(batch) > 1:
+                conn.execute("BEGIN IMMEDIATE")
+                for task in batch:
+                    self._execute_task(cur, task)
+                conn.commit()
+                self._finish(batch)
+                return
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            _LOG.debug("Batched DB write failed; replaying tasks individually", exc_info=True)
+
+        for task in batch:
+            task.rowid = None
+            try:
+                if task.sql is None:
+                    conn.execute("BEGIN IMMEDIATE")
+                self._execute_task(cur, task)
+                conn.commit()
+            except Exception as e:
+                task.exception = e
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                _LOG.exception("Error executing DB task")
+            finally:
+                self._finish([task])
+
+    def _finish(self, tasks):
+        for task in tasks:
+            task.done()
+
     def enqueue_and_wait(self, sql, params, wait_timeout=60.0):
         """
         Enqueue an SQL write and wait for the background thread to perform it.
         Returns the lastrowid or raises the exception raised during execution.
         """
         task = _DBTask(sql, params)
-        self._q.put(task)
+        self._put(task)
         completed = task.event.wait(wait_timeout)
         if not completed:
             raise TimeoutError(f"Timed out waiting for DB write to {self.database_path}")
@@ -135,12 +296,27 @@ class DBWriter:
             raise task.exception
         return task.rowid
 
+    def enqueue_script_and_wait(self, statements, wait_timeout=60.0):
+        """
+        Enqueue several statements to be executed atomically, in order, in one transaction.
+        Each entry is (sql, params); a list of parameter tuples is run with executemany.
+        Raises the exception of the failing statement (nothing of the script is kept).
+        """
+        task = _DBTask(None, statements)
+        self._put(task)
+        completed = task.event.wait(wait_timeout)
+        if not completed:
+            raise TimeoutError(f"Timed out waiting for DB write to {self.database_path}")
+        if task.exception:
+            raise task.exception
+        return None
+
     def enqueue_no_wait(self, sql, params):
         """
         Fire-and-forget enqueue (no result returned).
         """
-        task = _DBTask(sql, params)
-        self._q.put(task)
+        task = _DBTask(sql, params, wait=False)
+        self._put(task)
         return task
 
     def clear_queue(self):
@@ -150,8 +326,7 @@ class DBWriter:
                 task = self._q.get_nowait()
                 if task is not None:
                     task.exception = sqlite3.OperationalError("Database deleted - operation cancelled")
-                    task.event.set()
-                self._q.task_done()
+                    task.done()
         except queue.Empty:
             pass
 
@@ -160,10 +335,12 @@ class DBWriter:
         _LOG.info(f"Stopping DBWriter for database: {self.database_path}")
         self._stop.set()
         self.clear_queue()
-        for _ in range(self._num_workers):
+        with self._workers_lock:
+            workers = list(self._workers)
+        for _ in workers:
             self._q.put(None)
         if wait:
-            for worker in self._workers:
+            for worker in workers:
                 worker.join(timeout=5.0)
                 if worker.is_alive():
                     _LOG.warning(f"DBWriter worker thread for {self.database_path} did not stop within 5s")
@@ -1,13 +1,26 @@
+import functools
 import hashlib
+import json
 import os
+import re
+import sqlite3
+import stat
+import threading
 from typing import Any
 
 from utils.cache import project_cache, stats_cache
 from utils.logger import get_logger
 from utils.retry import retry_on_db_locked
 
-from .connection import get_db_connection
-from .db_writer import get_writer
+from .connection import (
+    forget_database,
+    get_pooled_connection,
+    mark_schema_ready,
+    read_connection,
+    release_pooled_connection,
+    schema_ready,
+)
+from .db_writer import get_writer, stop_writer
 
 _LOG = get_logger(__name__)
 
@@ -19,6 +32,9 @@ DB_RETRY_DELAY = 0.1
 def _execute_query(database_path: str, sql: str, params: tuple = (), fetch: str = "one") -> Any:
     """
     Helper to execute a single query with proper connection handling.
+    Fetching queries run on the shared read-only pool (read_connection), so UI reads
+    proceed in parallel with indexing writes under WAL; writes use the thread's
+    pooled connection.
 
     Args:
         database_path: Path to the database
@@ -32,32 +48,85 @@ def _execute_query(database_path: str, sql: str, params: tuple = (), fetch: str
     if not os.path.exists(database_path):
         return None
 
-    conn = get_db_connection(database_path, timeout=DB_TIMEOUT, enable_wal=True)
+    if fetch in ("one", "all"):
+        with read_connection(database_path) as conn:
+            cur = conn.execute(sql, params)
+            return cur.fetchone() if fetch == "one" else cur.fetchall()
+
+    conn = get_pooled_connection(database_path)
     try:
         cur = conn.cursor()
         cur.execute(sql, params)
-        if fetch == "one":
-            return cur.fetchone()
-        elif fetch == "all":
-            return cur.fetchall()
-        else:
-            conn.commit()
-            return cur.lastrowid if sql.strip().upper().startswith("INSERT") else None
+        conn.commit()
+        return cur.lastrowid if sql.strip().upper().startswith("INSERT") else None
     finally:
-        conn.close()
+        release_pooled_connection(conn)
+
+
+# Columns added to chunks after the initial schema; older databases are migrated in place
+CHUNK_TEXT_COLUMNS = {"text": "TEXT", "start_offset": "INTEGER", "end_offset": "INTEGER", "content_hash": "TEXT"}
 
 
-def init_db(database_path: str) -> None:
+def ensure_columns(cur, table: str, columns: dict[str, str]) -> None:
+    """
+    Add any of the given columns that are missing from an existing table.
+
+    Args:
+        cur: Cursor on the database to migrate
+        table: Table name
+        columns: Mapping of column name to SQL type declaration
+    """
+    existing = {row[1] for row in cur.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, decl in columns.items():
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+STATS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_files_count_insert AFTER INSERT ON files
+    BEGIN UPDATE project_stats SET file_count = file_count + 1 WHERE id = 1; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_files_count_delete AFTER DELETE ON files
+    BEGIN UPDATE project_stats SET file_count = file_count - 1 WHERE id = 1; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_chunks_count_insert AFTER INSERT ON chunks WHEN NEW.embedding IS NOT NULL
+    BEGIN UPDATE project_stats SET embedding_count = embedding_count + 1 WHERE id = 1; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_chunks_count_delete AFTER DELETE ON chunks WHEN OLD.embedding IS NOT NULL
+    BEGIN UPDATE project_stats SET embedding_count = embedding_count - 1 WHERE id = 1; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_chunks_count_update AFTER UPDATE OF embedding ON chunks
+    WHEN (OLD.embedding IS NULL) != (NEW.embedding IS NULL)
+    BEGIN
+        UPDATE project_stats SET embedding_count = embedding_count + (CASE WHEN NEW.embedding IS NULL THEN -1 ELSE 1 END) WHERE id = 1;
+    END
+    """,
+)
+STATS_TRIGGER_NAMES = ("trg_files_count_insert", "trg_files_count_delete", "trg_chunks_count_insert", "trg_chunks_count_delete", "trg_chunks_count_update")
+
+
+def init_db(database_path: str, force: bool = False) -> None:
     """
     Initialize database schema. Safe to call multiple times.
+    The DDL runs once per database per process; later calls return immediately unless
+    the file has disappeared or force is set (e.g. after a "no such table" error).
     Creates:
     - files (stores full content of indexed files with metadata for incremental indexing)
-    - chunks (with embedding BLOB column for sqlite-vector)
+    - chunks (with embedding BLOB column for sqlite-vector, plus the chunk text and its offsets)
     - project_metadata (project-level tracking)
-    - vector_meta (stores vector dimension metadata needed for vector operations)
+    - vector_meta (stores vector dimension and storage type needed for vector operations)
+    - project_stats (file/embedding counters maintained by triggers)
     - project_dependencies (cached dependencies per project)
     """
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
+    if not force and schema_ready(database_path) and os.path.exists(database_path):
+        return
+
+    conn = get_pooled_connection(database_path)
     try:
         cur = conn.cursor()
 
@@ -67,7 +136,6 @@ def init_db(database_path: str) -> None:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 path TEXT NOT NULL UNIQUE,
                 language TEXT,
-                snippet TEXT,
                 last_modified REAL,
                 file_hash TEXT,
                 created_at TEXT DEFAULT (datetime('now')),
@@ -86,12 +154,42 @@ def init_db(database_path: str) -> None:
                 path TEXT NOT NULL,
                 chunk_index INTEGER NOT NULL,
                 embedding BLOB,
+                text TEXT,
+                start_offset INTEGER,
+                end_offset INTEGER,
+                content_hash TEXT,
                 created_at TEXT DEFAULT (datetime('now')),
                 FOREIGN KEY (file_id) REFERENCES files(id) ON DELETE CASCADE
             )
             """
         )
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_file ON chunks(file_id);")
+        ensure_columns(cur, "chunks", CHUNK_TEXT_COLUMNS)
+        # (file_id, chunk_index) serves per-file lookups and chunk text fetches; it supersedes idx_chunks_file
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_file_chunk ON chunks(file_id, chunk_index);")
+        cur.execute("DROP INDEX IF EXISTS idx_chunks_file;")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_content_hash ON chunks(content_hash);")
+        # Partial index so embedding counts never touch the (overflowing) embedding blobs
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_file_embed ON chunks(file_id) WHERE embedding IS NOT NULL;")
+
+        # Single-row counters kept current by triggers, so stats never scan files/chunks
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS project_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                file_count INTEGER NOT NULL DEFAULT 0,
+                embedding_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Backfill once for databases created before the counters existed
+        cur.execute(
+            """
+            INSERT OR IGNORE INTO project_stats (id, file_count, embedding_count)
+            SELECT 1, (SELECT COUNT(*) FROM files), (SELECT COUNT(*) FROM chunks WHERE embedding IS NOT NULL)
+            """
+        )
+        for trigger in STATS_TRIGGERS:
+            cur.execute(trigger)
 
         cur.execute(
             """
@@ -136,35 +234,34 @@ def init_db(database_path: str) -> None:
         )
 
         conn.commit()
+        mark_schema_ready(database_path)
     except Exception as e:
         conn.rollback()
         raise e from e
     finally:
-        conn.close()
+        release_pooled_connection(conn)
 
 
-def store_file(database_path, path, content, language, last_modified=None, file_hash=None):
+def store_file(database_path, path, language, last_modified=None, file_hash=None):
     """
     Insert or update a file record into the DB using a queued single-writer to avoid
     sqlite 'database is locked' errors in multithreaded scenarios.
     Supports incremental indexing with last_modified and file_hash tracking.
-    Note: Does not store full file content in database (only snippet), content is read from filesystem when needed.
-    The content parameter is still required to generate the snippet.
+    Note: Does not store file content in database; chunk texts live in chunks and the
+    full content is read from filesystem when needed.
     Returns lastrowid (same as the previous store_file implementation).
     """
-    snippet = content[:512] if content else ""
     sql = """
-    INSERT INTO files (path, language, snippet, last_modified, file_hash, updated_at) 
-    VALUES (?, ?, ?, ?, ?, datetime('now'))
+    INSERT INTO files (path, language, last_modified, file_hash, updated_at) 
+    VALUES (?, ?, ?, ?, datetime('now'))
     ON CONFLICT(path) DO UPDATE SET 
         language=excluded.language,
-        snippet=excluded.snippet,
         last_modified=excluded.last_modified,
         file_hash=excluded.file_hash,
         updated_at=datetime('now')
     RETURNING id
     """
-    params = (path, language, snippet, last_modified, file_hash)
+    params = (path, language, last_modified, file_hash)
 
     # Initialize database if it doesn't exist
     if not os.path.exists(database_path):
@@ -181,7 +278,7 @@ def store_file(database_path, path, content, language, last_modified=None, file_
     except Exception as e:
         if "no such table" in str(e).lower():
             try:
-                init_db(database_path)
+                init_db(database_path, force=True)
                 rowid = writer.enqueue_and_wait(sql, params, wait_timeout=300.0)
                 _LOG.info(f"store_file succeeded after re-initializing DB {database_path}")
                 return rowid
@@ -197,6 +294,15 @@ def store_file(database_path, path, content, language, last_modified=None, file_
     return rowid
 
 
+def set_file_hash(database_path: str, file_id: int, file_hash: str | None) -> None:
+    """
+    Record the content hash of a file once all of its chunks are stored.
+    Indexing stores files with a NULL hash first, so a file whose embedding failed part-way
+    never matches its hash and is re-processed (and never copied to duplicates) on the next run.
+    """
+    get_writer(database_path).enqueue_and_wait("UPDATE files SET file_hash = ? WHERE id = ?", (file_hash, file_id))
+
+
 def get_project_stats(database_path: str) -> dict[str, Any]:
     """
     Get statistics for a project database.
@@ -208,10 +314,18 @@ def get_project_stats(database_path: str) -> dict[str, Any]:
     if cached is not None:
         return cached
 
-    files_row = _execute_query(database_path, "SELECT COUNT(*) FROM files")
-    chunks_row = _execute_query(database_path, "SELECT COUNT(*) FROM chunks WHERE embedding IS NOT NULL")
+    try:
+        row = _execute_query(database_path, "SELECT file_count, embedding_count FROM project_stats WHERE id = 1")
+    except sqlite3.OperationalError:
+        # Database not migrated by init_db yet
+        row = None
+    if row is None:
+        row = _execute_query(
+            database_path,
+            "SELECT (SELECT COUNT(*) FROM files), (SELECT COUNT(*) FROM chunks WHERE embedding IS NOT NULL)",
+        )
 
-    stats = {"file_count": int(files_row[0]) if files_row else 0, "embedding_count": int(chunks_row[0]) if chunks_row else 0}
+    stats = {"file_count": int(row[0]) if row else 0, "embedding_count": int(row[1]) if row else 0}
     stats_cache.set(cache_key, stats)
     return stats
 
@@ -223,7 +337,8 @@ def get_file_by_path(database_path: str, path: str) -> dict[str, Any] | None:
     """
     row = _execute_query(database_path, "SELECT id, path, last_modified, file_hash FROM files WHERE path = ?", (path,))
     if row:
-        return {"id": row["id"], "path": row["path"], "last_modified": row["last_modified"], "file_hash": row["file_hash"]}
+        file_id, file_path, last_modified, file_hash = row
+        return {"id": file_id, "path": file_path, "last_modified": last_modified, "file_hash": file_hash}
     return None
 
 
@@ -245,30 +360,22 @@ def needs_reindex(database_path: str, path: str, current_mtime: float, current_h
     return False
 
 
+_METADATA_UPSERT_SQL = """
+    INSERT INTO project_metadata (key, value, updated_at)
+    VALUES (?, ?, datetime('now'))
+    ON CONFLICT(key) DO UPDATE SET
+        value=excluded.value,
+        updated_at=datetime('now')
+"""
+
+
 def set_project_metadata(database_path: str, key: str, value: str) -> None:
     """
     Set a project metadata key-value pair and invalidate cache.
+    Written through the database's DBWriter like every other project write.
     """
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO project_metadata (key, value, updated_at) 
-            VALUES (?, ?, datetime('now'))
-            ON CONFLICT(key) DO UPDATE SET 
-                value=excluded.value,
-                updated_at=datetime('now')
-            """,
-            (key, value),
-        )
-        conn.commit()
-        project_cache.clear()
-    except Exception as e:
-        conn.rollback()
-        raise e from e
-    finally:
-        conn.close()
+    get_writer(database_path).enqueue_and_wait(_METADATA_UPSERT_SQL, (key, value))
+    project_cache.clear()
 
 
 def set_project_metadata_batch(database_path: str, metadata: dict[str, str]) -> None:
@@ -280,26 +387,19 @@ def set_project_metadata_batch(database_path: str, metadata: dict[str, str]) ->
     database_path: Path to the database
     metadata: Dictionary of key-value pairs to set
     """
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
+    get_writer(database_path).enqueue_script_and_wait([(_METADATA_UPSERT_SQL, list(metadata.items()))])
+
+
+def optimize_database(database_path: str) -> None:
+    """
+    Refresh the query planner statistics (sqlite_stat1) after a bulk write such as an indexing run.
+    analysis_limit makes ANALYZE sample each index instead of reading it in full, so this stays
+    cheap on large chunk tables. Failures are logged: stale statistics only cost plan quality.
+    """
     try:
-        cur = conn.cursor()
-        for key, value in metadata.items():
-            cur.execute(
-                """
-                INSERT INTO project_metadata (key, value, updated_at) 
-                VALUES (?, ?, datetime('now'))
-                ON CONFLICT(key) DO UPDATE SET 
-                    value=excluded.value,
-                    updated_at=datetime('now')
-                """,
-                (key, value),
-            )
-        conn.commit()
+        get_writer(database_path).enqueue_script_and_wait([("PRAGMA analysis_limit = 400", ()), ("ANALYZE", ())], wait_timeout=300.0)
     except Exception as e:
-        conn.rollback()
-        raise e from e
-    finally:
-        conn.close()
+        _LOG.warning(f"Failed to analyze {database_path}: {e}")
 
 
 def _compute_deps_hash(project_path: str) -> str:
@@ -352,57 +452,36 @@ def store_project_dependencies(database_path: str, project_id: str, deps: dict,
     `is_transitive` should be 0 for direct only, 1 for full.
     Existing rows for the same project_id and is_transitive are removed first.
     """
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
-    try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM project_dependencies WHERE project_id = ? AND is_transitive = ?", (project_id, is_transitive))
-        for lang, items in deps.items():
-            for item in items:
-                name = item.get("name")
-                version = item.get("version")
-                cur.execute(
-                    "INSERT OR REPLACE INTO project_dependencies (project_id, language, name, version, is_transitive) VALUES (?, ?, ?, ?, ?)",
-                    (project_id, lang, name, version, is_transitive),
-                )
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e from e
-    finally:
-        conn.close()
+    rows = [(project_id, lang, item.get("name"), item.get("version"), is_transitive) for lang, items in deps.items() for item in items]
+    get_writer(database_path).enqueue_script_and_wait(
+        [
+            ("DELETE FROM project_dependencies WHERE project_id = ? AND is_transitive = ?", (project_id, is_transitive)),
+            ("INSERT OR REPLACE INTO project_dependencies (project_id, language, name, version, is_transitive) VALUES (?, ?, ?, ?, ?)", rows),
+        ]
+    )
 
 
 def load_cached_dependencies(database_path: str, project_id: str, is_transitive: int) -> dict:
     """Load cached dependencies for a project and flag. Returns dict[language] = list of deps.
     If no rows exist, returns empty dict.
     """
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
-    try:
+    with read_connection(database_path) as conn:
         cur = conn.cursor()
+        # Plain tuples: unpacking is cheaper than keyed sqlite3.Row access per row
+        cur.row_factory = None
         cur.execute(
             "SELECT language, name, version FROM project_dependencies WHERE project_id = ? AND is_transitive = ? ORDER BY is_transitive ASC, name ASC",
             (project_id, is_transitive),
         )
-        rows = cur.fetchall()
         result: dict = {}
-        for row in rows:
-            lang = row["language"]
-            entry = {"name": row["name"], "version": row["version"]}
-            result.setdefault(lang, []).append(entry)
+        for lang, name, version in cur:
+            result.setdefault(lang, []).append({"name": name, "version": version})
         return result
-    finally:
-        conn.close()
 
 
 def clear_project_dependencies(database_path: str, project_id: str) -> None:
     """Remove all cached dependency rows for a project."""
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
-    try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM project_dependencies WHERE project_id = ?", (project_id,))
-        conn.commit()
-    finally:
-        conn.close()
+    get_writer(database_path).enqueue_and_wait("DELETE FROM project_dependencies WHERE project_id = ?", (project_id,))
 
 
 def compute_dependency_usage(database_path: str, project_path: str, deps: dict) -> dict:
@@ -411,16 +490,10 @@ def compute_dependency_usage(database_path: str, project_path: str, deps: dict)
     Matching is done using a regex that looks for the dependency name as a path component
     to reduce false positives (e.g., matching "log" inside "catalog").
     """
-    import re
-
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
-    try:
+    with read_connection(database_path) as conn:
         cur = conn.cursor()
-        cur.execute("SELECT path FROM files")
-        rows = cur.fetchall()
-        file_paths = [row["path"] for row in rows]
-    finally:
-        conn.close()
+        cur.row_factory = None
+        file_paths = [path for (path,) in cur.execute("SELECT path FROM files")]
     usage: dict = {}
     for lang, dep_list in deps.items():
         usage.setdefault(lang, {})
@@ -439,42 +512,27 @@ def store_dependency_usage(database_path: str, project_id: str, usage: dict) ->
     `usage` format: { language: { name: count, ... }, ... }
     Existing rows for the same project and language/name are replaced.
     """
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
-    try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM dependency_usage WHERE project_id = ?", (project_id,))
-        for lang, deps in usage.items():
-            for name, count in deps.items():
-                cur.execute(
-                    "INSERT INTO dependency_usage (project_id, language, name, file_count) VALUES (?, ?, ?, ?)",
-                    (project_id, lang, name, int(count)),
-                )
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    rows = [(project_id, lang, name, int(count)) for lang, deps in usage.items() for name, count in deps.items()]
+    get_writer(database_path).enqueue_script_and_wait(
+        [
+            ("DELETE FROM dependency_usage WHERE project_id = ?", (project_id,)),
+            ("INSERT INTO dependency_usage (project_id, language, name, file_count) VALUES (?, ?, ?, ?)", rows),
+        ]
+    )
 
 
 def load_dependency_usage(database_path: str, project_id: str) -> dict:
     """Load dependency usage counts.
     Returns dict[language][name] = file_count (empty dict if none).
     """
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
-    try:
+    with read_connection(database_path) as conn:
         cur = conn.cursor()
+        cur.row_factory = None
         cur.execute("SELECT language, name, file_count FROM dependency_usage WHERE project_id = ?", (project_id,))
-        rows = cur.fetchall()
         result: dict = {}
-        for row in rows:
-            lang = row["language"]
-            name = row["name"]
-            count = row["file_count"]
+        for lang, name, count in cur:
             result.setdefault(lang, {})[name] = count
         return result
-    finally:
-        conn.close()
 
 
 def clear_project_data(database_path: str) -> None:
@@ -482,18 +540,26 @@ def clear_project_data(database_path: str) -> None:
     Used before a full re‑index to start from a clean state.
     Also invalidates the stats cache.
     """
-    conn = get_db_connection(database_path, timeout=5.0, enable_wal=True)
+    # Any trigger on a table turns an unqualified DELETE into a row-by-row delete that fires it
+    # per row, so the stats triggers are dropped for the wipe (SQLite then truncates the tables
+    # wholesale), the counters are zeroed directly and the triggers recreated. The writer runs the
+    # script in one BEGIN IMMEDIATE transaction, so no other write can land between drop and recreate.
+    statements = [(f"DROP TRIGGER IF EXISTS {name}", ()) for name in STATS_TRIGGER_NAMES]
+    statements += [
+        ("DELETE FROM chunks", ()),
+        ("DELETE FROM files", ()),
+        ("UPDATE project_stats SET file_count = 0, embedding_count = 0 WHERE id = 1", ()),
+        ("DELETE FROM vector_meta WHERE key IN ('dimension', 'vector_type')", ()),
+    ]
+    statements += [(trigger, ()) for trigger in STATS_TRIGGERS]
     try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM chunks")
-        cur.execute("DELETE FROM files")
-        cur.execute("DELETE FROM vector_meta WHERE key = 'dimension'")
-        conn.commit()
+        get_writer(database_path).enqueue_script_and_wait(statements, wait_timeout=300.0)
         stats_cache.invalidate(f"stats:{database_path}")
-    except Exception:
-        pass
-    finally:
-        conn.close()
+    except Exception as e:
+        # The script was rolled back (or may still be pending after a timeout); make the next
+        # init_db re-run the DDL so the counter triggers are guaranteed to exist
+        mark_schema_ready(database_path, False)
+        _LOG.warning(f"Failed to clear project data in {database_path}: {e}")
 
 
 def get_project_metadata(database_path: str, key: str) -> str | None:
@@ -506,6 +572,8 @@ def get_project_metadata(database_path: str, key: str) -> str | None:
 
 PROJECTS_DIR = os.path.expanduser("~/.picocode/projects")
 
+_REGISTRY_INIT_LOCK = threading.Lock()
+
 DB_RETRY_COUNT = 3
 DB_RETRY_DELAY = 0.1  # seconds
 
@@ -519,10 +587,12 @@ def _ensure_projects_dir():
         raise
 
 
+@functools.lru_cache(maxsize=1024)
 def _get_project_id(project_path: str) -> str:
-    """Generate a stable project ID from the project path."""
-    import hashlib
-
+    """
+    Generate a stable project ID from the project path.
+    The digest must not change: IDs name the per-project database files and appear in API URLs.
+    """
     return hashlib.sha256(project_path.encode()).hexdigest()[:16]
 
 
@@ -534,16 +604,34 @@ def _get_project_db_path(project_id: str) -> str:
 
 def _get_projects_registry_path() -> str:
     """Get the path to the projects registry database."""
-    _ensure_projects_dir()
-    return os.path.join(PROJECTS_DIR, "registry.db")
+    registry_path = os.path.join(PROJECTS_DIR, "registry.db")
+    # Once the registry is initialized the directory is known to exist
+    if not schema_ready(registry_path):
+        _ensure_projects_dir()
+    return registry_path
 
 
 @retry_on_db_locked(max_retries=DB_RETRY_COUNT, base_delay=DB_RETRY_DELAY)
 def _init_registry_db():
-    """Initialize the projects registry database with proper configuration."""
-    registry_path = _get_projects_registry_path()
+    """
+    Initialize the projects registry database with proper configuration.
+    Every registry API calls this first, so after the first successful run it only
+    checks a flag; the lock keeps concurrent first calls from racing on the DDL.
+    """
+    registry_path = os.path.join(PROJECTS_DIR, "registry.db")
+    if schema_ready(registry_path) and os.path.exists(registry_path):
+        return
+
+    with _REGISTRY_INIT_LOCK:
+        if schema_ready(registry_path) and os.path.exists(registry_path):
+            return
+        _ensure_projects_dir()
+        _create_registry_schema(registry_path)
+
 
-    conn = get_db_connection(registry_path, timeout=5.0, enable_wal=True)
+def _create_registry_schema(registry_path: str) -> None:
+    """Create the projects table and remember that the registry schema is in place."""
+    conn = get_pooled_connection(registry_path)
     try:
         cur = conn.cursor()
         cur.execute(
@@ -560,12 +648,15 @@ def _init_registry_db():
             )
             """
         )
+        # Lets list_projects walk projects newest-first without sorting the registry
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_projects_created_at ON projects(created_at DESC);")
         conn.commit()
+        mark_schema_ready(registry_path)
     except Exception as e:
         conn.rollback()
         raise e from e
     finally:
-        conn.close()
+        release_pooled_connection(conn)
 
 
 def create_project(project_path: str, name: str | None = None) -> dict[str, Any]:
@@ -596,22 +687,19 @@ def create_project(project_path: str, name: str | None = None) -> dict[str, Any]
         raise ValueError("Path traversal not allowed in project path")
 
     try:
-        project_path = os.path.abspath(os.path.realpath(project_path))
+        project_path = os.path.realpath(project_path)
     except Exception as e:
         raise ValueError(f"Invalid project path: {e}") from e
 
+    # One stat answers both "exists" and "is a directory"
     try:
-        path_exists = os.path.exists(project_path)  # nosec
-        if not path_exists:
-            raise ValueError("Project path does not exist")
-
-        is_directory = os.path.isdir(project_path)  # nosec
-        if not is_directory:
-            raise ValueError("Project path is not a directory")
-    except (OSError, ValueError) as e:
-        if isinstance(e, ValueError):
-            raise
+        st = os.stat(project_path)  # nosec
+    except (FileNotFoundError, NotADirectoryError) as e:
+        raise ValueError("Project path does not exist") from e
+    except OSError as e:
         raise ValueError("Cannot access project path") from e
+    if not stat.S_ISDIR(st.st_mode):
+        raise ValueError("Project path is not a directory")
 
     project_id = _get_project_id(project_path)
     db_path = _get_project_db_path(project_id)
@@ -626,24 +714,28 @@ def create_project(project_path: str, name: str | None = None) -> dict[str, Any]
 
     @retry_on_db_locked(max_retries=DB_RETRY_COUNT, base_delay=DB_RETRY_DELAY)
     def _create():
-        conn = get_db_connection(registry_path, timeout=5.0, enable_wal=True)
+        conn = get_pooled_connection(registry_path)
         try:
             cur = conn.cursor()
 
-            cur.execute("SELECT * FROM projects WHERE path = ?", (project_path,))
-            existing = cur.fetchone()
-            if existing:
-                _LOG.info(f"Project already exists: {project_path}")
-                return dict(existing)
-
+            # Insert-or-skip in one statement that also hands back the new row;
+            # only an existing path needs the follow-up SELECT
             cur.execute(
                 """
                 INSERT INTO projects (id, name, path, database_path, status)
                 VALUES (?, ?, ?, ?, 'created')
+                ON CONFLICT(path) DO NOTHING
+                RETURNING *
                 """,
                 (project_id, name, project_path, db_path),
             )
+            inserted = cur.fetchone()
             conn.commit()
+            if inserted is None:
+                cur.execute("SELECT * FROM projects WHERE path = ?", (project_path,))
+                existing = cur.fetchone()
+                _LOG.info(f"Project already exists: {project_path}")
+                return dict(existing) if existing else None
 
             try:
                 init_db(db_path)
@@ -651,16 +743,15 @@ def create_project(project_path: str, name: str | None = None) -> dict[str, Any]
             except Exception as e:
                 _LOG.error(f"Failed to initialize project database: {e}")
                 cur.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+                conn.commit()
+                return None
 
-            cur.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
-            row = cur.fetchone()
-            result = dict(row) if row else None
-            if result:
-                project_cache.set(f"project:id:{project_id}", result)
-                project_cache.set(f"project:path:{project_path}", result)
+            result = dict(inserted)
+            project_cache.set(f"project:id:{project_id}", result)
+            project_cache.set(f"project:path:{project_path}", result)
             return result
         finally:
-            conn.close()
+            release_pooled_connection(conn)
 
     try:
         result = _create()
@@ -684,8 +775,7 @@ def get_project(project_path: str) -> dict[str, Any] | None:
 
     @retry_on_db_locked(max_retries=DB_RETRY_COUNT, base_delay=DB_RETRY_DELAY)
     def _get():
-        conn = get_db_connection(registry_path, timeout=5.0, enable_wal=True)
-        try:
+        with read_connection(registry_path) as conn:
             cur = conn.cursor()
             cur.execute("SELECT * FROM projects WHERE path = ?", (project_path,))
             row = cur.fetchone()
@@ -693,8 +783,6 @@ def get_project(project_path: str) -> dict[str, Any] | None:
             if result:
                 project_cache.set(cache_key, result)
             return result
-        finally:
-            conn.close()
 
     return _get()
 
@@ -712,8 +800,7 @@ def get_project_by_id(project_id: str) -> dict[str, Any] | None:
 
     @retry_on_db_locked(max_retries=DB_RETRY_COUNT, base_delay=DB_RETRY_DELAY)
     def _get():
-        conn = get_db_connection(registry_path, timeout=5.0, enable_wal=True)
-        try:
+        with read_connection(registry_path) as conn:
             cur = conn.cursor()
             cur.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
             row = cur.fetchone()
@@ -721,28 +808,35 @@ def get_project_by_id(project_id: str) -> dict[str, Any] | None:
             if result:
                 project_cache.set(cache_key, result)
             return result
-        finally:
-            conn.close()
 
     return _get()
 
 
-def list_projects() -> list[dict[str, Any]]:
-    """List all registered projects."""
+def list_projects(limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+    """
+    List registered projects, newest first.
+
+    Args:
+        limit: Maximum number of projects to return (None for all)
+        offset: Number of projects to skip (used together with limit for pagination)
+    """
     _init_registry_db()
 
     registry_path = _get_projects_registry_path()
 
     @retry_on_db_locked(max_retries=DB_RETRY_COUNT, base_delay=DB_RETRY_DELAY)
     def _list():
-        conn = get_db_connection(registry_path, timeout=5.0, enable_wal=True)
-        try:
+        with read_connection(registry_path) as conn:
             cur = conn.cursor()
-            cur.execute("SELECT * FROM projects ORDER BY created_at DESC")
-            rows = cur.fetchall()
-            return [dict(row) for row in rows]
-        finally:
-            conn.close()
+            # Plain tuples zipped with the column names: dict(sqlite3.Row) looks every column up by name
+            cur.row_factory = None
+            if limit is None and not offset:
+                cur.execute("SELECT * FROM projects ORDER BY created_at DESC")
+            else:
+                # LIMIT -1 means no limit in SQLite
+                cur.execute("SELECT * FROM projects ORDER BY created_at DESC LIMIT ? OFFSET ?", (-1 if limit is None else limit, offset))
+            columns = [d[0] for d in cur.description]
+            return [dict(zip(columns, row, strict=True)) for row in cur.fetchall()]
 
     return _list()
 
@@ -755,7 +849,7 @@ def update_project_status(project_id: str, status: str, last_indexed_at: str | N
 
     @retry_on_db_locked(max_retries=DB_RETRY_COUNT, base_delay=DB_RETRY_DELAY)
     def _update():
-        conn = get_db_connection(registry_path, timeout=5.0, enable_wal=True)
+        conn = get_pooled_connection(registry_path)
         try:
             cur = conn.cursor()
             if last_indexed_at:
@@ -767,7 +861,7 @@ def update_project_status(project_id: str, status: str, last_indexed_at: str | N
             conn.rollback()
             raise e from e
         finally:
-            conn.close()
+            release_pooled_connection(conn)
 
     _update()
     project_cache.invalidate(f"project:id:{project_id}")
@@ -775,24 +869,22 @@ def update_project_status(project_id: str, status: str, last_indexed_at: str | N
 
 def update_project_settings(project_id: str, settings: dict[str, Any]):
     """Update project settings (stored as JSON) and invalidate cache."""
-    import json
-
     _init_registry_db()
 
     registry_path = _get_projects_registry_path()
 
     @retry_on_db_locked(max_retries=DB_RETRY_COUNT, base_delay=DB_RETRY_DELAY)
     def _update():
-        conn = get_db_connection(registry_path, timeout=5.0, enable_wal=True)
+        conn = get_pooled_connection(registry_path)
         try:
             cur = conn.cursor()
-            cur.execute("UPDATE projects SET settings = ? WHERE id = ?", (json.dumps(settings), project_id))
+            cur.execute("UPDATE projects SET settings = ? WHERE id = ?", (json.dumps(settings, separators=(",", ":"), ensure_ascii=False), project_id))
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e from e
         finally:
-            conn.close()
+            release_pooled_connection(conn)
 
     _update()
     project_cache.invalidate(f"project:id:{project_id}")
@@ -814,21 +906,24 @@ def delete_project(project_id: str):
     db_path = project.get("database_path")
     if db_path and os.path.exists(db_path):
         try:
-            from db.db_writer import stop_writer
-
             stop_writer(db_path)
         except Exception:
             pass
-        try:
-            os.remove(db_path)
-        except Exception:
-            pass
+        # Pooled and read-pool connections keep the file open; Windows cannot delete it while they do
+        forget_database(db_path)
+        for path in (db_path, db_path + "-wal", db_path + "-shm"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                _LOG.warning(f"Failed to remove {path}: {e}")
 
     registry_path = _get_projects_registry_path()
 
     @retry_on_db_locked(max_retries=DB_RETRY_COUNT, base_delay=DB_RETRY_DELAY)
     def _delete():
-        conn = get_db_connection(registry_path, timeout=5.0, enable_wal=True)
+        conn = get_pooled_connection(registry_path)
         try:
             cur = conn.cursor()
             cur.execute("DELETE FROM projects WHERE id = ?", (project_id,))
@@ -837,7 +932,7 @@ def delete_project(project_id: str):
             conn.rollback()
             raise e from e
         finally:
-            conn.close()
+            release_pooled_connection(conn)
 
     _delete()
     project_cache.invalidate(f"project:id:{project_id}")
@@ -5,13 +5,15 @@ The program will ALWAYS crash if the sqlite-vector extension fails to load (stri
 """
 
 import importlib.resources
-import json
 import os
 import sqlite3
 from typing import Any
 
+import numpy as np
+
 from utils.logger import get_logger
-from utils.retry import retry_on_exception
+from utils.retry import is_db_locked, retry_on_db_locked
+from utils.vector_math import as_f32, norm, quantize_int8
 
 logger = get_logger(__name__)
 # _logged_extension_ids = set()  # disabled to avoid repeated logging
@@ -23,6 +25,54 @@ SQLITE_VECTOR_VERSION_FN = "vector_version"  # SELECT vector_version();
 DB_LOCK_RETRY_COUNT = 6
 DB_LOCK_RETRY_BASE_DELAY = 0.05  # seconds, exponential backoff multiplier
 
+# Resolve the packaged binary once; every new connection then only pays for load_extension
+try:
+    _VECTOR_EXT_PATH: str | None = str(importlib.resources.files(SQLITE_VECTOR_PKG) / SQLITE_VECTOR_RESOURCE)
+    _VECTOR_EXT_ERROR: Exception | None = None
+except Exception as e:
+    _VECTOR_EXT_PATH = None
+    _VECTOR_EXT_ERROR = e
+
+# The vector_version() sanity check only needs to pass once per process
+_VECTOR_VERSION_CHECKED = False
+
+# Supported chunks.embedding storage types and the sqlite-vector conversion function for each.
+# Databases indexed before vector_type was recorded in vector_meta hold FLOAT32 vectors.
+VECTOR_TYPE_FUNCS = {"FLOAT32": "vector_as_f32", "FLOAT16": "vector_as_f16", "INT8": "vector_as_i8"}
+LEGACY_VECTOR_TYPE = "FLOAT32"
+
+
+def _configured_vector_type() -> str:
+    """Vector type for databases that are being initialized (VECTOR_TYPE setting)."""
+    from utils.config import CFG
+
+    vector_type = str(CFG.get("vector_type") or LEGACY_VECTOR_TYPE).upper()
+    if vector_type not in VECTOR_TYPE_FUNCS:
+        logger.warning(f"Unsupported VECTOR_TYPE {vector_type!r}, falling back to {LEGACY_VECTOR_TYPE}")
+        return LEGACY_VECTOR_TYPE
+    return vector_type
+
+
+def _get_vector_meta(cur: sqlite3.Cursor) -> tuple[int | None, str]:
+    """Read (dimension, vector_type) from vector_meta; dimension is None if nothing is indexed yet."""
+    cur.execute("SELECT key, value FROM vector_meta WHERE key IN ('dimension', 'vector_type')")
+    meta = dict(cur.fetchall())
+    dim = int(meta["dimension"]) if meta.get("dimension") else None
+    return dim, meta.get("vector_type") or LEGACY_VECTOR_TYPE
+
+
+def _encode_vector(vector, vector_type: str) -> bytes:
+    """
+    Serialize a vector to the raw binary layout of vector_type.
+    The vector_as_* functions take a BLOB argument as an already-encoded vector, so no
+    JSON is produced on insert or query and the extension does no text parsing.
+    """
+    if vector_type == "INT8":
+        return quantize_int8(vector).tobytes()
+    if vector_type == "FLOAT16":
+        return as_f32(vector).astype(np.float16).tobytes()
+    return as_f32(vector).tobytes()
+
 
 def load_sqlite_vector_extension(conn: sqlite3.Connection) -> None:
     """
@@ -41,16 +91,24 @@ def load_sqlite_vector_extension(conn: sqlite3.Connection) -> None:
     Raises:
         RuntimeError: If the extension fails to load
     """
+    global _VECTOR_VERSION_CHECKED
+
+    if _VECTOR_EXT_PATH is None:
+        raise RuntimeError(f"Failed to load sqlite-vector extension: {_VECTOR_EXT_ERROR}")
     try:
-        ext_path = importlib.resources.files(SQLITE_VECTOR_PKG) / SQLITE_VECTOR_RESOURCE
-        conn.load_extension(str(ext_path))
-        conn_id = id(conn)
-        # Suppress per-connection logging to avoid noisy duplicate messages
+        conn.enable_load_extension(True)
         try:
-            cur = conn.execute(f"SELECT {SQLITE_VECTOR_VERSION_FN}()")
-            _ = cur.fetchone()
-        except Exception:
-            pass
+            conn.load_extension(_VECTOR_EXT_PATH)
+        finally:
+            conn.enable_load_extension(False)
+        if not _VECTOR_VERSION_CHECKED:
+            # Suppress per-connection logging to avoid noisy duplicate messages
+            try:
+                cur = conn.execute(f"SELECT {SQLITE_VECTOR_VERSION_FN}()")
+                _ = cur.fetchone()
+                _VECTOR_VERSION_CHECKED = True
+            except Exception:
+                pass
     except Exception as e:
         raise RuntimeError(f"Failed to load sqlite-vector extension: {e}") from e
 
@@ -63,6 +121,8 @@ def ensure_chunks_and_meta(conn: sqlite3.Connection):
     Args:
         conn: SQLite database connection
     """
+    from .operations import CHUNK_TEXT_COLUMNS, ensure_columns
+
     cur = conn.cursor()
     cur.execute(
         """
@@ -72,10 +132,18 @@ def ensure_chunks_and_meta(conn: sqlite3.Connection):
             path TEXT NOT NULL,
             chunk_index INTEGER NOT NULL,
             embedding BLOB,
+            text TEXT,
+            start_offset INTEGER,
+            end_offset INTEGER,
+            content_hash TEXT,
             created_at TEXT DEFAULT (datetime('now'))
         )
         """
     )
+    ensure_columns(cur, "chunks", CHUNK_TEXT_COLUMNS)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_file_chunk ON chunks(file_id, chunk_index);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_content_hash ON chunks(content_hash);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_file_embed ON chunks(file_id) WHERE embedding IS NOT NULL;")
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS vector_meta (
@@ -87,22 +155,63 @@ def ensure_chunks_and_meta(conn: sqlite3.Connection):
     conn.commit()
 
 
-def set_vector_dimension(conn: sqlite3.Connection, dim: int):
+def set_vector_dimension(conn: sqlite3.Connection, dim: int, vector_type: str | None = None):
     """
-    Store the vector dimension in metadata table.
+    Store the vector dimension (and optionally the storage type) in metadata table.
 
     Args:
         conn: SQLite database connection
         dim: Vector dimension to store
+        vector_type: Storage type of chunks.embedding (a VECTOR_TYPE_FUNCS key)
     """
     cur = conn.cursor()
     cur.execute("INSERT OR REPLACE INTO vector_meta(key, value) VALUES('dimension', ?)", (str(dim),))
+    if vector_type:
+        cur.execute("INSERT OR REPLACE INTO vector_meta(key, value) VALUES('vector_type', ?)", (vector_type,))
     conn.commit()
 
 
-def insert_chunk_vector_with_retry(conn: sqlite3.Connection, file_id: int, path: str, chunk_index: int, vector: list[float]) -> int:
+def _prepare_vector_insert(conn: sqlite3.Connection, cur: sqlite3.Cursor, dim: int) -> str:
+    """
+    Validate (or, for the first vector, record) the dimension and storage type and run vector_init.
+
+    Returns:
+        The vector_type of the database
+
+    Raises:
+        RuntimeError: If vector_init fails or the dimension does not match the stored one
     """
-    Insert a chunk row with embedding using vector_as_f32(json); retries on sqlite3.OperationalError 'database is locked'.
+    stored_dim, vector_type = _get_vector_meta(cur)
+    if stored_dim is None:
+        vector_type = _configured_vector_type()
+        set_vector_dimension(conn, dim, vector_type)
+        logger.info(f"Initialized vector dimension: {dim} ({vector_type})")
+        try:
+            conn.execute(f"SELECT vector_init('chunks', 'embedding', 'dimension={dim},type={vector_type},distance=COSINE')")
+            logger.debug(f"Vector index initialized for dimension {dim}")
+        except Exception as e:
+            logger.error(f"vector_init failed: {e}")
+            raise RuntimeError(f"vector_init failed: {e}") from e
+    elif stored_dim != dim:
+        logger.error(f"Embedding dimension mismatch: stored={stored_dim}, new={dim}")
+        raise RuntimeError(f"Embedding dimension mismatch: stored={stored_dim}, new={dim}")
+    return vector_type
+
+
+def insert_chunk_vector_with_retry(
+    conn: sqlite3.Connection,
+    file_id: int,
+    path: str,
+    chunk_index: int,
+    vector: list[float],
+    text: str | None = None,
+    start_offset: int | None = None,
+    end_offset: int | None = None,
+) -> int:
+    """
+    Insert a chunk row with a binary embedding (vector_as_f32/f16/i8, depending on the database's vector_type);
+    retries on sqlite3.OperationalError 'database is locked'.
+    The chunk text and its character offsets are stored alongside so retrieval does not need to re-read the file.
 
     Args:
         conn: SQLite database connection
@@ -110,6 +219,9 @@ def insert_chunk_vector_with_retry(conn: sqlite3.Connection, file_id: int, path:
         path: File path
         chunk_index: Index of this chunk within the file
         vector: Embedding vector as list of floats
+        text: Chunk text (optional)
+        start_offset: Character offset where the chunk starts in the file (optional)
+        end_offset: Character offset where the chunk ends in the file (optional)
 
     Returns:
         The chunks.rowid of the inserted row
@@ -119,44 +231,31 @@ def insert_chunk_vector_with_retry(conn: sqlite3.Connection, file_id: int, path:
     """
     cur = conn.cursor()
     ensure_chunks_and_meta(conn)
+    vector_type = _prepare_vector_insert(conn, cur, len(vector))
 
-    cur.execute("SELECT value FROM vector_meta WHERE key = 'dimension'")
-    row = cur.fetchone()
-    dim = len(vector)
-    if not row:
-        set_vector_dimension(conn, dim)
-        logger.info(f"Initialized vector dimension: {dim}")
-        try:
-            conn.execute(f"SELECT vector_init('chunks', 'embedding', 'dimension={dim},type=FLOAT32,distance=COSINE')")
-            logger.debug(f"Vector index initialized for dimension {dim}")
-        except Exception as e:
-            logger.error(f"vector_init failed: {e}")
-            raise RuntimeError(f"vector_init failed: {e}") from e
-    else:
-        stored_dim = int(row[0])
-        if stored_dim != dim:
-            logger.error(f"Embedding dimension mismatch: stored={stored_dim}, new={dim}")
-            raise RuntimeError(f"Embedding dimension mismatch: stored={stored_dim}, new={dim}")
-
-    q_vec = json.dumps(vector)
+    q_vec = _encode_vector(vector, vector_type)
+    to_vector = VECTOR_TYPE_FUNCS[vector_type]
 
-    @retry_on_exception(exceptions=(sqlite3.OperationalError,), max_retries=DB_LOCK_RETRY_COUNT, base_delay=DB_LOCK_RETRY_BASE_DELAY, exponential_backoff=True)
+    @retry_on_db_locked(max_retries=DB_LOCK_RETRY_COUNT, base_delay=DB_LOCK_RETRY_BASE_DELAY)
     def _insert_with_retry():
         """Inner function with retry logic."""
         try:
-            cur.execute("INSERT INTO chunks (file_id, path, chunk_index, embedding) VALUES (?, ?, ?, vector_as_f32(?))", (file_id, path, chunk_index, q_vec))
+            cur.execute(
+                f"INSERT INTO chunks (file_id, path, chunk_index, embedding, text, start_offset, end_offset) VALUES (?, ?, ?, {to_vector}(?), ?, ?, ?)",
+                (file_id, path, chunk_index, q_vec, text, start_offset, end_offset),
+            )
             conn.commit()
             rowid = int(cur.lastrowid)
             logger.debug(f"Inserted chunk vector for {path} chunk {chunk_index}, rowid={rowid}")
             return rowid
         except sqlite3.OperationalError as e:
-            if "database is locked" not in str(e).lower():
+            if not is_db_locked(e):
                 logger.error(f"Failed to insert chunk vector: {e}")
-                raise RuntimeError(f"Failed to INSERT chunk vector (vector_as_f32 call): {e}") from e
+                raise RuntimeError(f"Failed to INSERT chunk vector ({to_vector} call): {e}") from e
             raise  # Re-raise for retry decorator to handle
         except Exception as e:
             logger.error(f"Failed to insert chunk vector: {e}")
-            raise RuntimeError(f"Failed to INSERT chunk vector (vector_as_f32 call): {e}") from e
+            raise RuntimeError(f"Failed to INSERT chunk vector ({to_vector} call): {e}") from e
 
     try:
         return _insert_with_retry()
@@ -165,12 +264,154 @@ def insert_chunk_vector_with_retry(conn: sqlite3.Connection, file_id: int, path:
         raise RuntimeError(f"Failed to INSERT chunk vector after retries: {e}") from e
 
 
-_CACHED_DIM = None
+def insert_chunk_vectors_bulk(
+    conn: sqlite3.Connection,
+    file_id: int,
+    path: str,
+    rows: list[tuple[int, list[float] | bytes, str | None, int | None, int | None, str | None]],
+) -> int:
+    """
+    Insert several chunk rows of one file with executemany in a single transaction.
+    Retries the whole batch on sqlite3.OperationalError 'database is locked'.
+    A vector given as bytes is an embedding already stored in this database (see
+    lookup_chunk_embeddings) and is written as-is.
+
+    Args:
+        conn: SQLite database connection
+        file_id: ID of the file the chunks belong to
+        path: File path
+        rows: Tuples of (chunk_index, vector, text, start_offset, end_offset, content_hash)
+
+    Returns:
+        Number of inserted rows
+
+    Raises:
+        RuntimeError: If vector operations fail or dimension mismatch occurs
+    """
+    if not rows:
+        return 0
+    cur = conn.cursor()
+    ensure_chunks_and_meta(conn)
+    dims = {len(vector) for _, vector, _, _, _, _ in rows if not isinstance(vector, bytes)}
+    if len(dims) > 1:
+        raise RuntimeError(f"Embedding dimension mismatch within batch for {path}")
+    if dims:
+        vector_type = _prepare_vector_insert(conn, cur, dims.pop())
+    else:
+        vector_type = _get_vector_meta(cur)[1]
+    to_vector = VECTOR_TYPE_FUNCS[vector_type]
+    params = [
+        (file_id, path, chunk_index, vector if isinstance(vector, bytes) else _encode_vector(vector, vector_type), text, start, end, content_hash)
+        for chunk_index, vector, text, start, end, content_hash in rows
+    ]
+
+    @retry_on_db_locked(max_retries=DB_LOCK_RETRY_COUNT, base_delay=DB_LOCK_RETRY_BASE_DELAY)
+    def _insert_with_retry():
+        try:
+            cur.executemany(
+                f"INSERT INTO chunks (file_id, path, chunk_index, embedding, text, start_offset, end_offset, content_hash) VALUES (?, ?, ?, {to_vector}(?), ?, ?, ?, ?)",
+                params,
+            )
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            if not is_db_locked(e):
+                logger.error(f"Failed to insert chunk vectors: {e}")
+                raise RuntimeError(f"Failed to INSERT chunk vectors ({to_vector} call): {e}") from e
+            raise  # Re-raise for retry decorator to handle
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to insert chunk vectors: {e}")
+            raise RuntimeError(f"Failed to INSERT chunk vectors ({to_vector} call): {e}") from e
+
+    try:
+        _insert_with_retry()
+    except sqlite3.OperationalError as e:
+        logger.error(f"Failed to insert chunk vectors after {DB_LOCK_RETRY_COUNT} retries: {e}")
+        raise RuntimeError(f"Failed to INSERT chunk vectors after retries: {e}") from e
+    logger.debug(f"Inserted {len(params)} chunk vectors for {path}")
+    return len(params)
+
+
+def lookup_chunk_embeddings(conn: sqlite3.Connection, content_hashes: list[str]) -> dict[str, bytes]:
+    """
+    Find stored embeddings for chunk texts that were embedded before (in any file).
+
+    Args:
+        conn: SQLite database connection
+        content_hashes: Chunk content hashes to look up
+
+    Returns:
+        Mapping of content_hash -> stored embedding blob for the hashes that were found
+    """
+    if not content_hashes:
+        return {}
+    unique = list(dict.fromkeys(content_hashes))
+    placeholders = ",".join("?" * len(unique))
+    rows = conn.execute(
+        f"SELECT content_hash, embedding FROM chunks WHERE content_hash IN ({placeholders}) AND embedding IS NOT NULL GROUP BY content_hash",
+        unique,
+    ).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def count_file_chunks(conn: sqlite3.Connection, file_id: int) -> int:
+    """Number of chunk rows stored for a file."""
+    row = conn.execute("SELECT COUNT(*) FROM chunks WHERE file_id = ?", (file_id,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def delete_file_chunks(conn: sqlite3.Connection, file_id: int) -> int:
+    """
+    Delete all chunk rows of a file, e.g. before re-embedding changed content.
+
+    Returns:
+        Number of deleted rows
+    """
+    cur = conn.execute("DELETE FROM chunks WHERE file_id = ?", (file_id,))
+    conn.commit()
+    return cur.rowcount
+
+
+def copy_chunks_from_duplicate(conn: sqlite3.Connection, file_id: int, path: str, file_hash: str) -> int:
+    """
+    Reuse the chunks (text, offsets and embeddings) of another already-embedded file with the same
+    content hash, so identical content is only sent to the embedding API once.
+
+    Args:
+        conn: SQLite database connection
+        file_id: ID of the file that receives the chunks
+        path: Path of the file that receives the chunks
+        file_hash: Content hash of the file
+
+    Returns:
+        Number of copied chunk rows (0 if no embedded duplicate exists)
+    """
+    if not file_hash:
+        return 0
+    cur = conn.execute(
+        """
+        INSERT INTO chunks (file_id, path, chunk_index, embedding, text, start_offset, end_offset, content_hash)
+        SELECT ?, ?, c.chunk_index, c.embedding, c.text, c.start_offset, c.end_offset, c.content_hash
+        FROM chunks AS c
+        WHERE c.file_id = (
+            SELECT f.id FROM files AS f
+            WHERE f.file_hash = ? AND f.id != ?
+              AND EXISTS (SELECT 1 FROM chunks WHERE file_id = f.id)
+            LIMIT 1
+        )
+        """,
+        (file_id, path, file_hash, file_id),
+    )
+    conn.commit()
+    return cur.rowcount
 
 
 def search_vectors(database_path: str, q_vector: list[float], top_k: int = 5) -> list[dict[str, Any]]:
     """
     Uses vector_full_scan to retrieve nearest neighbors from the chunks table.
+    Runs on a pooled read-only connection; vector_init is only repeated on a connection
+    when the stored dimension/type differs from what it was initialized with.
 
     Args:
         database_path: Path to the SQLite database
@@ -178,48 +419,56 @@ def search_vectors(database_path: str, q_vector: list[float], top_k: int = 5) ->
         top_k: Number of top results to return
 
     Returns:
-        List of dicts: {file_id, path, chunk_index, score}
+        List of dicts: {file_id, path, chunk_index, score, text}
+        (text is None for chunks indexed before chunk text was stored)
 
     Raises:
         RuntimeError: If vector search operations fail
     """
-    from .connection import db_connection
+    from .connection import read_connection
 
     logger.debug(f"Searching vectors in database: {database_path}, top_k={top_k}")
 
-    with db_connection(database_path) as conn:
-        ensure_chunks_and_meta(conn)
+    if not norm(q_vector):
+        logger.warning("Query vector has zero length - cosine distance is undefined")
+        return []
 
+    with read_connection(database_path) as conn:
         cur = conn.cursor()
-        global _CACHED_DIM
-        if _CACHED_DIM is not None:
-            dim = _CACHED_DIM
-        else:
-            cur.execute("SELECT value FROM vector_meta WHERE key = 'dimension'")
-            row = cur.fetchone()
-            if not row:
-                logger.info("No vector dimension found in metadata - no chunks indexed yet")
-                return []
-            dim = int(row[0])
-            _CACHED_DIM = dim  # cache for future calls
         try:
-            conn.execute(f"SELECT vector_init('chunks', 'embedding', 'dimension={dim},type=FLOAT32,distance=COSINE')")
-            logger.debug(f"Vector index initialized for search with dimension {dim}")
-        except Exception as e:
-            logger.error(f"vector_init failed during search: {e}")
-            raise RuntimeError(f"vector_init failed during search: {e}") from e
+            dim, vector_type = _get_vector_meta(cur)
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e).lower():
+                raise
+            dim = None
+        if dim is None:
+            logger.info("No vector dimension found in metadata - no chunks indexed yet")
+            return []
+
+        if getattr(conn, "vector_context", None) != (dim, vector_type):
+            try:
+                conn.execute(f"SELECT vector_init('chunks', 'embedding', 'dimension={dim},type={vector_type},distance=COSINE')")
+                logger.debug(f"Vector index initialized for search with dimension {dim}")
+            except Exception as e:
+                logger.error(f"vector_init failed during search: {e}")
+                raise RuntimeError(f"vector_init failed during search: {e}") from e
+            try:
+                conn.vector_context = (dim, vector_type)
+            except AttributeError:
+                pass  # plain sqlite3.Connection: initialize again next time
 
-        q_json = json.dumps(q_vector)
+        # The query is quantized the same way as the stored vectors
+        q_blob = _encode_vector(q_vector, vector_type)
         try:
             cur.execute(
-                """
-                SELECT c.file_id, c.path, c.chunk_index, v.distance
-                FROM vector_full_scan('chunks', 'embedding', vector_as_f32(?), ?) AS v
+                f"""
+                SELECT c.file_id, c.path, c.chunk_index, v.distance, c.text
+                FROM vector_full_scan('chunks', 'embedding', {VECTOR_TYPE_FUNCS[vector_type]}(?), ?) AS v
                 JOIN chunks AS c ON c.rowid = v.rowid
                 ORDER BY v.distance ASC
                 LIMIT ?
                 """,
-                (q_json, top_k, top_k),
+                (q_blob, top_k, top_k),
             )
             rows = cur.fetchall()
             logger.debug(f"Vector search returned {len(rows)} results")
@@ -228,19 +477,20 @@ def search_vectors(database_path: str, q_vector: list[float], top_k: int = 5) ->
             raise RuntimeError(f"vector_full_scan call failed: {e}") from e
 
         results: list[dict[str, Any]] = []
-        for file_id, path, chunk_index, distance in rows:
+        for file_id, path, chunk_index, distance, text in rows:
             try:
                 score = 1.0 - float(distance)
             except Exception:
                 score = float(distance)
-            results.append({"file_id": int(file_id), "path": path, "chunk_index": int(chunk_index), "score": score})
+            results.append({"file_id": int(file_id), "path": path, "chunk_index": int(chunk_index), "score": score, "text": text})
         return results
 
 
 def get_chunk_text(database_path: str, file_id: int, chunk_index: int) -> str | None:
     """
-    Get chunk text by reading from filesystem instead of database.
-    Uses project_path metadata and file path to read the actual file.
+    Get chunk text stored on the chunk row at indexing time.
+    Falls back to reading the file from the filesystem for chunks indexed before
+    the text column existed, using project_path metadata and the file path.
 
     Args:
         database_path: Path to the SQLite database
@@ -250,9 +500,14 @@ def get_chunk_text(database_path: str, file_id: int, chunk_index: int) -> str |
     Returns:
         The chunk text, or None if not found
     """
-    from .connection import db_connection
+    from .connection import read_connection
     from .operations import get_project_metadata
 
+    with read_connection(database_path) as conn:
+        row = conn.execute("SELECT text FROM chunks WHERE file_id = ? AND chunk_index = ? ORDER BY id DESC LIMIT 1", (file_id, chunk_index)).fetchone()
+        if row and row[0]:
+            return row[0]
+
     # Cache project path (fetched once per call, cached globally if needed)
     project_path = get_project_metadata(database_path, "project_path")
     if not project_path:
@@ -260,56 +515,54 @@ def get_chunk_text(database_path: str, file_id: int, chunk_index: int) -> str |
         raise RuntimeError("Project path metadata is missing - ensure the indexing process has stored project metadata properly")
 
     # Normalize project path once
-    normalized_project_path = os.path.abspath(os.path.realpath(project_path))
+    normalized_project_path = os.path.realpath(project_path)
 
-    with db_connection(database_path) as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT path FROM files WHERE id = ?", (file_id,))
-        row = cur.fetchone()
-        if not row:
-            logger.warning(f"File not found in database: file_id={file_id}")
-            return None
-
-        file_path = row[0]
-        if not file_path:
-            logger.warning(f"File path is empty for file_id={file_id}")
-            return None
-
-        full_path = os.path.abspath(os.path.realpath(os.path.join(project_path, file_path)))
+    with read_connection(database_path) as conn:
+        row = conn.execute("SELECT path FROM files WHERE id = ?", (file_id,)).fetchone()
+    if not row:
+        logger.warning(f"File not found in database: file_id={file_id}")
+        return None
 
-        # Single path traversal check (both conditions in one validation)
-        try:
-            if os.path.commonpath([full_path, normalized_project_path]) != normalized_project_path:
-                logger.error(f"Path traversal attempt detected: {file_path} resolves outside project directory")
-                return None
-        except ValueError:
-            logger.error(f"Path traversal attempt detected: {file_path} is on a different drive or incompatible path")
-            return None
+    file_path = row[0]
+    if not file_path:
+        logger.warning(f"File path is empty for file_id={file_id}")
+        return None
 
-        try:
-            with open(full_path, encoding="utf-8", errors="replace") as fh:
-                content = fh.read()
-        except Exception as e:
-            logger.warning(f"Failed to read file from filesystem: {full_path}, error: {e}")
-            return None
+    full_path = os.path.realpath(os.path.join(project_path, file_path))
 
-        if not content:
+    # Single path traversal check (both conditions in one validation)
+    try:
+        if os.path.commonpath([full_path, normalized_project_path]) != normalized_project_path:
+            logger.error(f"Path traversal attempt detected: {file_path} resolves outside project directory")
             return None
+    except ValueError:
+        logger.error(f"Path traversal attempt detected: {file_path} is on a different drive or incompatible path")
+        return None
 
-        try:
-            from ai.analyzer import CHUNK_OVERLAP, CHUNK_SIZE
-        except Exception:
-            CHUNK_SIZE = 800
-            CHUNK_OVERLAP = 100
-
-        if CHUNK_SIZE <= 0:
-            return content
+    try:
+        with open(full_path, encoding="utf-8", errors="replace") as fh:
+            content = fh.read()
+    except Exception as e:
+        logger.warning(f"Failed to read file from filesystem: {full_path}, error: {e}")
+        return None
 
-        if chunk_index < 0:
-            logger.warning(f"Invalid chunk_index {chunk_index} for file_id={file_id}")
-            return None
+    if not content:
+        return None
 
-        step = max(1, CHUNK_SIZE - CHUNK_OVERLAP)
-        start = chunk_index * step
-        end = min(start + CHUNK_SIZE, len(content))
-        return content[start:end]
+    try:
+        from ai.analyzer import CHUNK_OVERLAP, CHUNK_SIZE
+    except Exception:
+        CHUNK_SIZE = 800
+        CHUNK_OVERLAP = 100
+
+    if CHUNK_SIZE <= 0:
+        return content
+
+    if chunk_index < 0:
+        logger.warning(f"Invalid chunk_index {chunk_index} for file_id={file_id}")
+        return None
+
+    step = max(1, CHUNK_SIZE - CHUNK_OVERLAP)
+    start = chunk_index * step
+    end = min(start + CHUNK_SIZE, len(content))
+    return content[start:end]
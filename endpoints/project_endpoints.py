@@ -10,7 +10,7 @@ from fastapi.responses import JSONResponse
 
 from db.models import CreateProjectRequest, IndexProjectRequest
 from db.operations import delete_project, get_or_create_project, get_project_by_id, get_project_metadata, init_db, list_projects, update_project_status
-from services.dependency_service import get_project_dependencies
+from services.dependency_service import add_transitive_dependencies, get_project_dependencies
 from utils.config import CFG
 from utils.logger import get_logger
 
@@ -251,7 +251,7 @@ def api_index_project(http_request: Request, request: IndexProjectRequest, backg
 
     try:
         project = get_project_by_id(request.project_id)
-        from db.operations import set_project_metadata
+        from db.operations import set_project_metadata_batch
 
         if not project:
             return JSONResponse({"error": "Project not found"}, status_code=404)
@@ -277,26 +277,29 @@ def api_index_project(http_request: Request, request: IndexProjectRequest, backg
             clear_project_dependencies(db_path, project_id)
 
         update_project_status(request.project_id, "indexing")
-        set_project_metadata(db_path, "direct_deps_count", "0")
-        set_project_metadata(db_path, "direct_deps_indexed", "0")
-        set_project_metadata(db_path, "full_deps_count", "0")
-        set_project_metadata(db_path, "full_deps_indexed", "0")
+        set_project_metadata_batch(
+            db_path,
+            {
+                "direct_deps_count": "0",
+                "direct_deps_indexed": "0",
+                "full_deps_count": "0",
+                "full_deps_indexed": "0",
+            },
+        )
 
         venv_path = CFG.get("venv_path")
         incremental = False
 
-        set_project_metadata(db_path, "full_deps_count", "0")
-        set_project_metadata(db_path, "full_deps_indexed", "0")
-
         def index_callback():
             try:
                 from ai.analyzer import analyze_local_path_sync
-                from db.operations import set_project_metadata, store_project_dependencies
+                from db.connection import read_connection
+                from db.operations import set_project_metadata_batch, store_project_dependencies
                 from services.dependency_service import get_project_dependencies
                 from services.dependency_usage import compute_and_store_usage
 
                 # Phase 1: Index only project files (not dependencies)
-                analyze_local_path_sync(project_path, db_path, venv_path, MAX_FILE_SIZE, CFG, incremental=incremental)
+                analyze_local_path_sync(project_path, db_path, venv_path, MAX_FILE_SIZE, CFG)
                 print("Phase 1 complete: Indexed project files only")
 
                 if not indexing_active.get(project_id, False):
@@ -310,7 +313,7 @@ def api_index_project(http_request: Request, request: IndexProjectRequest, backg
                 # Index dependency files (only .venv and node_modules)
                 from ai.analyzer import analyze_dependencies_sync
 
-                analyze_dependencies_sync(project_path, db_path, venv_path, MAX_FILE_SIZE, CFG, incremental=incremental)
+                analyze_dependencies_sync(project_path, db_path, venv_path, MAX_FILE_SIZE, CFG)
                 print("Phase 2 complete: Indexed direct dependencies")
                 if not indexing_active.get(project_id, False):
                     logger.info(f"Indexing for project {project_id} cancelled after file processing")
@@ -322,40 +325,24 @@ def api_index_project(http_request: Request, request: IndexProjectRequest, backg
                     logger.info(f"Indexing for project {project_id} cancelled after dependency extraction")
                     return
                 store_project_dependencies(db_path, project_id, direct_deps, is_transitive=0)
-                try:
-                    from db.connection import get_db_connection
-
-                    conn = get_db_connection(db_path, timeout=5.0, enable_wal=False)
-                    cur = conn.cursor()
-                    cur.execute("SELECT COUNT(*) FROM project_dependencies WHERE project_id = ? AND is_transitive = 0", (project_id,))
-                    dep_count = cur.fetchone()[0]
-                    logger.info(f"Inserted {dep_count} direct dependency rows for project {project_id}")
-                finally:
-                    conn.close()
+                with read_connection(db_path) as conn:
+                    dep_count = conn.execute("SELECT COUNT(*) FROM project_dependencies WHERE project_id = ? AND is_transitive = 0", (project_id,)).fetchone()[0]
+                logger.info(f"Inserted {dep_count} direct dependency rows for project {project_id}")
                 compute_and_store_usage(db_path, project_id, direct_deps)
                 direct_deps_count = sum(len(v) for v in direct_deps.values())
-                set_project_metadata(db_path, "direct_deps_count", str(direct_deps_count))
-                set_project_metadata(db_path, "direct_deps_indexed", "1")
+                set_project_metadata_batch(db_path, {"direct_deps_count": str(direct_deps_count), "direct_deps_indexed": "1"})
                 if not incremental:
-                    full_deps = get_project_dependencies(project_path, include_transitive=True)
+                    full_deps = add_transitive_dependencies(project_path, direct_deps)
                     if not indexing_active.get(project_id, False):
                         logger.info(f"Indexing for project {project_id} cancelled before full dependency storage")
                         return
                     store_project_dependencies(db_path, project_id, full_deps, is_transitive=1)
-                    try:
-                        from db.connection import get_db_connection
-
-                        conn_full = get_db_connection(db_path, timeout=5.0, enable_wal=False)
-                        cur_full = conn_full.cursor()
-                        cur_full.execute("SELECT COUNT(*) FROM project_dependencies WHERE project_id = ? AND is_transitive = 1", (project_id,))
-                        dep_full_count = cur_full.fetchone()[0]
-                        logger.debug(f"Inserted {dep_full_count} full dependency rows for project {project_id}")
-                    finally:
-                        conn_full.close()
+                    with read_connection(db_path) as conn:
+                        dep_full_count = conn.execute("SELECT COUNT(*) FROM project_dependencies WHERE project_id = ? AND is_transitive = 1", (project_id,)).fetchone()[0]
+                    logger.debug(f"Inserted {dep_full_count} full dependency rows for project {project_id}")
                     compute_and_store_usage(db_path, project_id, full_deps)
                     full_deps_count = sum(len(v) for v in full_deps.values())
-                    set_project_metadata(db_path, "full_deps_count", str(full_deps_count))
-                    set_project_metadata(db_path, "full_deps_indexed", "1")
+                    set_project_metadata_batch(db_path, {"full_deps_count": str(full_deps_count), "full_deps_indexed": "1"})
                 update_project_status(request.project_id, "ready", datetime.utcnow().isoformat())
                 indexing_active[project_id] = False
             except Exception as e:
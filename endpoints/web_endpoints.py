@@ -7,6 +7,7 @@ import os
 from datetime import datetime
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
@@ -115,7 +116,9 @@ def index_project(background_tasks: BackgroundTasks, project_path: str = None):
 
 @router.post("/code")
 async def code_endpoint(request: Request):
-    """Code completion endpoint - uses project_id to find the right database."""
+    """Code completion endpoint - uses project_id to find the right database.
+    Database, search and model calls block, so they run in the threadpool instead of on the event loop.
+    """
     payload = None
     try:
         payload = await request.json()
@@ -136,19 +139,19 @@ async def code_endpoint(request: Request):
     project_id = payload.get("project_id")
 
     if not project_id:
-        projects = list_projects()
+        projects = await run_in_threadpool(list_projects)
         if not projects:
             return JSONResponse({"error": "No projects available. Please index a project first."}, status_code=400)
         project_id = projects[0]["id"]
 
     try:
-        project = get_project_by_id(project_id)
+        project = await run_in_threadpool(get_project_by_id, project_id)
         if not project:
             return JSONResponse({"error": "Project not found"}, status_code=404)
 
         database_path = project["database_path"]
 
-        stats = get_project_stats(database_path)
+        stats = await run_in_threadpool(get_project_stats, database_path)
         if stats["file_count"] == 0:
             return JSONResponse({"error": "Project not indexed yet. Please run indexing first."}, status_code=400)
     except Exception as e:
@@ -165,7 +168,7 @@ async def code_endpoint(request: Request):
 
     if use_rag:
         try:
-            retrieved = search_semantic(prompt, database_path, top_k=top_k)
+            retrieved = await run_in_threadpool(search_semantic, prompt, database_path, top_k=top_k)
             context_parts = []
             total_len = len(combined_context)
             for r in retrieved:
@@ -199,7 +202,7 @@ async def code_endpoint(request: Request):
             used_context = []
 
     try:
-        resp = call_coding_model(prompt, combined_context)
+        resp = await run_in_threadpool(call_coding_model, prompt, combined_context)
     except Exception as e:
         return JSONResponse({"error": f"coding model call failed: {e}"}, status_code=500)
 
@@ -23,8 +23,9 @@ from endpoints.query_endpoints import router as query_router
 from endpoints.web_endpoints import router as web_router
 from utils.config import CFG
 from utils.file_watcher import FileWatcher
-from utils.logger import get_logger
+from utils.logger import get_logger, setup_logging, shutdown_logging
 
+setup_logging()
 logger = get_logger(__name__)
 
 # Ensure NLTK data is available at startup
@@ -62,6 +63,9 @@ def cleanup_on_exit():
     except Exception as e:
         logger.error(f"Error stopping database writers: {e}")
 
+    # Last: the writers above may still log while shutting down
+    shutdown_logging()
+
 
 def signal_handler(signum, frame):
     """Handle termination signals."""
@@ -137,7 +141,7 @@ async def lifespan(app: FastAPI):
                         try:
                             from ai.analyzer import analyze_local_path_sync
 
-                            analyze_local_path_sync(p_path, d_path, venv_path_local, MAX_FILE_SIZE, CFG, incremental=False)
+                            analyze_local_path_sync(p_path, d_path, venv_path_local, MAX_FILE_SIZE, CFG)
                             update_project_status(p_id, "ready", datetime.utcnow().isoformat())
                         except Exception as e:
                             logger.exception(f"Failed to resume indexing for project {p_id}: {e}")
@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 import os
@@ -5,9 +6,30 @@ import re
 import xml.etree.ElementTree as ET
 from typing import Any
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=32)
+def _parse_toml(path: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    """Parse a TOML file; cached on (path, mtime, size) so unchanged manifests are parsed once."""
+    with open(path, "rb") as fh:
+        return tomllib.load(fh)
+
+
+def _load_toml(path: str) -> dict[str, Any]:
+    """
+    Load a TOML file through the parse cache.
+    The returned dict is shared between callers and must not be modified.
+    """
+    st = os.stat(path)
+    return _parse_toml(path, st.st_mtime_ns, st.st_size)
+
+
 def _read_requirements_txt(project_path: str) -> list[dict[str, str]]:
     """Parse a requirements.txt file and return list of packages with optional versions."""
     req_path = os.path.join(project_path, "requirements.txt")
@@ -34,20 +56,11 @@ def _read_requirements_txt(project_path: str) -> list[dict[str, str]]:
 
 def _read_pyproject_toml(project_path: str) -> list[dict[str, str]]:
     """Parse pyproject.toml for dependencies (PEP 621) and poetry dependencies."""
-    try:
-        import tomli
-    except Exception:
-        try:
-            import tomllib as tomli
-        except Exception as e:
-            logger.exception(f"Failed to import TOML parser for Cargo.toml: {e}")
-            return []
     toml_path = os.path.join(project_path, "pyproject.toml")
     if not os.path.isfile(toml_path):
         return []
     try:
-        with open(toml_path, "rb") as fh:
-            data = tomli.load(fh)
+        data = _load_toml(toml_path)
     except Exception:
         return []
     deps: list[dict[str, str]] = []
@@ -87,20 +100,11 @@ def _read_package_json(project_path: str) -> list[dict[str, str]]:
 
 def _read_cargo_toml(project_path: str) -> list[dict[str, str]]:
     """Parse Cargo.toml for Rust dependencies (both regular and dev)."""
-    try:
-        import tomli
-    except Exception:
-        try:
-            import tomllib as tomli
-        except Exception as e:
-            logger.exception(f"Failed to import TOML parser for Cargo.toml: {e}")
-            return []
     toml_path = os.path.join(project_path, "Cargo.toml")
     if not os.path.isfile(toml_path):
         return []
     try:
-        with open(toml_path, "rb") as fh:
-            data = tomli.load(fh)
+        data = _load_toml(toml_path)
     except Exception:
         return []
     deps: list[dict[str, str]] = []
@@ -121,20 +125,11 @@ def _read_cargo_toml(project_path: str) -> list[dict[str, str]]:
 
 def _read_cargo_lock(project_path: str) -> list[dict[str, str]]:
     """Parse Cargo.lock to get exact crate versions (if present)."""
-    try:
-        import tomli
-    except Exception:
-        try:
-            import tomllib as tomli
-        except Exception as e:
-            logger.exception(f"Failed to import TOML parser for Cargo.toml: {e}")
-            return []
     lock_path = os.path.join(project_path, "Cargo.lock")
     if not os.path.isfile(lock_path):
         return []
     try:
-        with open(lock_path, "rb") as fh:
-            data = tomli.load(fh)
+        data = _load_toml(lock_path)
     except Exception as e:
         logger.exception(f"Failed to parse Cargo.lock: {e}")
         return []
@@ -241,16 +236,10 @@ def get_project_dependencies(project_path: str, include_transitive: bool = False
     js_deps = _read_package_json(project_path)
     if js_deps:
         result["javascript"] = js_deps
-    rust_deps = []
-    rust_deps.extend(_read_cargo_toml(project_path))
-    if include_transitive:
-        rust_deps.extend(_read_cargo_lock(project_path))
+    rust_deps = _read_cargo_toml(project_path)
     if rust_deps:
         result["rust"] = rust_deps
-    go_deps = []
-    go_deps.extend(_read_go_mod(project_path))
-    if include_transitive:
-        go_deps.extend(_read_go_sum(project_path))
+    go_deps = _read_go_mod(project_path)
     if go_deps:
         result["go"] = go_deps
     java_deps = []
@@ -258,4 +247,19 @@ def get_project_dependencies(project_path: str, include_transitive: bool = False
     java_deps.extend(_read_build_gradle(project_path))
     if java_deps:
         result["java"] = java_deps
+    if include_transitive:
+        return add_transitive_dependencies(project_path, result)
+    return result
+
+
+def add_transitive_dependencies(project_path: str, direct_deps: dict[str, Any]) -> dict[str, Any]:
+    """Extend a get_project_dependencies() result with lock-file (transitive) entries.
+    Lets callers that already hold the direct dependencies build the full set without
+    reading the manifests again. direct_deps itself is not modified.
+    """
+    result = {lang: list(deps) for lang, deps in direct_deps.items()}
+    for lang, reader in (("rust", _read_cargo_lock), ("go", _read_go_sum)):
+        extra = reader(project_path)
+        if extra:
+            result.setdefault(lang, []).extend(extra)
     return result
@@ -0,0 +1,78 @@
+"""
+Admission control for concurrent calls to rate-limited services.
+"""
+
+import threading
+
+
+class AdmissionController:
+    """
+    Thread-safe counting gate whose limit can be changed while threads are waiting.
+    Unlike threading.Semaphore, lowering the limit is well defined: threads already
+    admitted finish normally and new ones wait until the active count drops below it.
+
+    Supports additive-increase/multiplicative-decrease tuning: call backoff() when the
+    upstream service signals overload (e.g. HTTP 429) and grow() after a success.
+    """
+
+    def __init__(self, limit: int, min_limit: int = 1, max_limit: int | None = None):
+        """
+        Initialize the controller.
+
+        Args:
+            limit: Initial number of concurrent holders
+            min_limit: Lower bound for resize()/backoff()
+            max_limit: Upper bound for resize()/grow() (defaults to the initial limit)
+        """
+        self._cond = threading.Condition(threading.Lock())
+        self._active = 0
+        self._min = max(1, min_limit)
+        self._max = max(self._min, max_limit if max_limit is not None else limit)
+        self._limit = min(self._max, max(self._min, limit))
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def acquire(self) -> None:
+        """Block until the active count is below the current limit, then take a slot."""
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+
+    def release(self) -> None:
+        """Give back a slot and wake one waiter."""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def resize(self, limit: int) -> None:
+        """Set a new limit, clamped to [min_limit, max_limit]."""
+        with self._cond:
+            limit = min(self._max, max(self._min, limit))
+            grew = limit > self._limit
+            self._limit = limit
+            if grew:
+                self._cond.notify_all()
+
+    def backoff(self) -> None:
+        """Halve the limit (multiplicative decrease)."""
+        self.resize(self._limit // 2)
+
+    def grow(self) -> None:
+        """Raise the limit by one (additive increase)."""
+        if self._limit < self._max:
+            self.resize(self._limit + 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
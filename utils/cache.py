@@ -110,3 +110,5 @@ stats_cache = LRUCache(max_size=100, ttl=60)  # 1 minute TTL
 search_cache = LRUCache(max_size=500, ttl=600)  # 10 minutes TTL
 
 file_cache = LRUCache(max_size=200, ttl=300)  # 5 minutes TTL
+
+embedding_cache = LRUCache(max_size=1024, ttl=3600)  # 1 hour TTL, query embeddings keyed by model and text
@@ -39,4 +39,5 @@ CFG = {
     "file_watcher_debounce": _int_env("FILE_WATCHER_DEBOUNCE", 5),
     "debug": _bool_env("DEBUG", False),
     "db_writer_workers": _int_env("DB_WRITER_WORKERS", 2),
+    "vector_type": os.getenv("VECTOR_TYPE", "INT8").upper(),
 }
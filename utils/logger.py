@@ -2,13 +2,17 @@
 Centralized logging configuration for PicoCode.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 
 from utils.config import CFG
 
 # Track whether logging has been configured
 _logging_configured = False
+_log_listener: logging.handlers.QueueListener | None = None
 
 
 def setup_logging() -> None:
@@ -16,13 +20,26 @@ def setup_logging() -> None:
     Configure logging for the application.
     Should be called once at startup, not during module import.
     """
-    global _logging_configured
+    global _logging_configured, _log_listener
     if _logging_configured:
         return
 
-    logging.basicConfig(
-        level=logging.DEBUG if CFG.get("debug") else logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", handlers=[logging.StreamHandler(sys.stdout)]
-    )
+    # Indexing threads only merge msg % args (and any traceback) and enqueue the record, so
+    # mutable args are rendered as logged and no frames are kept alive; the formatted line and
+    # the blocking stdout write happen on the listener thread
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _log_listener.start()
+    # Fallback for processes that never call shutdown_logging themselves
+    atexit.register(shutdown_logging)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # prepare() merges the message with this formatter; the stream handler adds time, name and level
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logging.basicConfig(level=logging.DEBUG if CFG.get("debug") else logging.INFO, handlers=[queue_handler])
 
     if CFG.get("debug"):
         logging.getLogger("llama_index").setLevel(logging.INFO)
@@ -32,6 +49,25 @@ def setup_logging() -> None:
     _logging_configured = True
 
 
+def shutdown_logging() -> None:
+    """
+    Drain the log queue and stop the listener thread.
+    Call after everything that still logs during shutdown (e.g. DBWriter workers) has stopped;
+    records logged later are written directly by the stream handler instead of being queued.
+    """
+    global _log_listener
+    listener, _log_listener = _log_listener, None
+    if listener is None:
+        return
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance for a module.
@@ -4,6 +4,8 @@ Provides consistent retry behavior across all operations.
 """
 
 import functools
+import random
+import sqlite3
 import time
 from collections.abc import Callable
 from typing import Any
@@ -13,8 +15,38 @@ from utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+def _backoff_delay(base_delay: float, attempt: int, exponential_backoff: bool = True, jitter: bool = True) -> float:
+    """
+    Compute the sleep before the next attempt.
+    Jitter scales the delay by a random factor in [0.5, 1.5) so that threads which hit
+    the same lock at the same moment do not all retry in lockstep.
+    """
+    delay = base_delay * (2**attempt) if exponential_backoff else base_delay
+    if jitter:
+        delay *= random.uniform(0.5, 1.5)
+    return delay
+
+
+def is_db_locked(e: Exception) -> bool:
+    """Check if exception is a transient SQLite lock/busy error."""
+    if not isinstance(e, sqlite3.OperationalError):
+        return False
+    code = getattr(e, "sqlite_errorcode", None)
+    if code is not None:
+        # Primary result code (low byte) covers extended codes such as SQLITE_BUSY_SNAPSHOT
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    # Raised from Python code rather than by SQLite: fall back to the message
+    msg = str(e).lower()
+    return "locked" in msg or "busy" in msg
+
+
 def retry_on_exception(
-    exceptions: tuple[type[Exception], ...] = (Exception,), max_retries: int = 3, base_delay: float = 0.1, exponential_backoff: bool = True, log_retries: bool = True
+    exceptions: tuple[type[Exception], ...] = (Exception,),
+    max_retries: int = 3,
+    base_delay: float = 0.1,
+    exponential_backoff: bool = True,
+    log_retries: bool = True,
+    jitter: bool = True,
 ):
     """
     Decorator for retrying operations with exponential backoff.
@@ -25,6 +57,7 @@ def retry_on_exception(
         base_delay: Base delay in seconds between retries
         exponential_backoff: Use exponential backoff (delay = base_delay * 2^attempt)
         log_retries: Log retry attempts
+        jitter: Randomize each delay by a factor in [0.5, 1.5)
 
     Returns:
         Decorated function that retries on specified exceptions
@@ -53,10 +86,7 @@ def retry_on_exception(
                     if attempt == max_retries - 1:
                         raise
 
-                    if exponential_backoff:
-                        delay = base_delay * (2**attempt)
-                    else:
-                        delay = base_delay
+                    delay = _backoff_delay(base_delay, attempt, exponential_backoff, jitter)
 
                     if log_retries:
                         logger.warning(f"Retry {attempt + 1}/{max_retries} for {func.__name__} after {delay:.3f}s due to: {type(e).__name__}: {e}")
@@ -71,23 +101,20 @@ def retry_on_exception(
     return decorator
 
 
-def retry_on_db_locked(max_retries: int = 3, base_delay: float = 0.1):
+def retry_on_db_locked(max_retries: int = 3, base_delay: float = 0.1, jitter: bool = True):
     """
     Specialized retry decorator for database locked errors.
-    Wrapper around retry_on_exception with sqlite3.OperationalError filter.
+    Retries sqlite3.OperationalError "locked"/"busy" errors with jittered exponential backoff;
+    any other error is raised immediately.
 
     Args:
         max_retries: Maximum number of retry attempts
         base_delay: Base delay in seconds between retries
+        jitter: Randomize each delay by a factor in [0.5, 1.5)
 
     Returns:
         Decorated function that retries on database locked errors
     """
-    import sqlite3
-
-    def is_db_locked(e: Exception) -> bool:
-        """Check if exception is a database locked error."""
-        return isinstance(e, sqlite3.OperationalError) and "database is locked" in str(e).lower()
 
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -106,7 +133,7 @@ def retry_on_db_locked(max_retries: int = 3, base_delay: float = 0.1):
                     if attempt == max_retries - 1:
                         raise
 
-                    delay = base_delay * (2**attempt)
+                    delay = _backoff_delay(base_delay, attempt, jitter=jitter)
                     logger.warning(f"Database locked, retry {attempt + 1}/{max_retries} for {func.__name__} after {delay:.3f}s")
                     time.sleep(delay)
 
@@ -0,0 +1,45 @@
+"""
+Vectorized helpers for embedding math.
+All operations dispatch to NumPy so they run in vectorized kernels
+instead of per-element Python loops.
+"""
+
+import numpy as np
+
+
+def as_f32(vector) -> np.ndarray:
+    """
+    Convert a vector to a contiguous float32 array.
+    Arrays that are already float32 and contiguous are returned without copying,
+    so callers ranking in a loop should convert once and pass the array around.
+
+    Args:
+        vector: List of floats or ndarray
+
+    Returns:
+        1-D float32 ndarray
+    """
+    return np.ascontiguousarray(vector, dtype=np.float32)
+
+
+def norm(a) -> float:
+    """Euclidean (L2) norm of a vector."""
+    return float(np.linalg.norm(as_f32(a)))
+
+
+def quantize_int8(vector) -> np.ndarray:
+    """
+    Symmetric per-vector int8 quantization: scale so the largest magnitude maps to 127.
+    The scale factor is not kept because cosine distance is invariant to it.
+
+    Args:
+        vector: List of floats or ndarray
+
+    Returns:
+        1-D int8 ndarray (all zeros for a zero vector)
+    """
+    v = as_f32(vector)
+    max_abs = float(np.max(np.abs(v))) if v.size else 0.0
+    if not max_abs:
+        return np.zeros(v.shape, dtype=np.int8)
+    return np.clip(np.rint(v * (127.0 / max_abs)), -127, 127).astype(np.int8)